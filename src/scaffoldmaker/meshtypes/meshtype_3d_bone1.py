@@ -20,8 +20,6 @@ from scaffoldmaker.utils.meshrefinement import MeshRefinement
 from scaffoldmaker.utils.shieldmesh import ShieldMesh3D
 from scaffoldmaker.utils.spheremesh import SphereMesh, SphereShape
 from scaffoldmaker.utils.zinc_utils import exnode_string_from_nodeset_field_parameters
-from scaffoldmaker.utils.derivativemoothing import DerivativeSmoothing
-from scaffoldmaker.annotation.annotationgroup import AnnotationGroup, findOrCreateAnnotationGroupForTerm
 
 
 class MeshType_3d_bone1 (Scaffold_base):
@@ -170,7 +168,7 @@ with variable numbers of elements in major, minor, shell and axial directions.
         full = not options['Lower half']
         elementsCountAcrossMajor = options['Number of elements across major']
         if not full:
-            elementsCountAcrossMajor //= 2
+            elementsCountAcrossMajor >>= 1
         elementsCountAcrossMinor = options['Number of elements across minor']
         elementsCountAcrossShell = options['Number of elements across shell']
         elementsCountAcrossTransition = options['Number of elements across transition']
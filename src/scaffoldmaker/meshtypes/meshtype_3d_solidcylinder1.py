@@ -6,15 +6,97 @@ Generates a solid cylinder using a ShieldMesh of all cube elements,
 from __future__ import division
 
 import copy
+import pickle
+import sys
 
-from cmlibs.utils.zinc.field import findOrCreateFieldCoordinates
-from cmlibs.zinc.node import Node
 from scaffoldmaker.meshtypes.meshtype_1d_path1 import MeshType_1d_path1
 from scaffoldmaker.meshtypes.scaffold_base import Scaffold_base
 from scaffoldmaker.scaffoldpackage import ScaffoldPackage
-from scaffoldmaker.utils.cylindermesh import CylinderMesh, CylinderShape, CylinderEnds, CylinderCentralPath
-from scaffoldmaker.utils.meshrefinement import MeshRefinement
-from scaffoldmaker.utils.zinc_utils import exnode_string_from_nodeset_field_parameters
+
+# heavier Zinc and mesh building imports are deferred to the methods needing
+# them so enumerating scaffold types does not load the full C extension stack
+
+# option names are interned module constants so the dict lookups in checkOptions
+# and generateBaseMesh compare by identity on the fast path
+_OPTION_CENTRAL_PATH = sys.intern('Central path')
+_OPTION_ELEMENTS_COUNT_ACROSS_MAJOR = sys.intern('Number of elements across major')
+_OPTION_ELEMENTS_COUNT_ACROSS_MINOR = sys.intern('Number of elements across minor')
+_OPTION_ELEMENTS_COUNT_ACROSS_SHELL = sys.intern('Number of elements across shell')
+_OPTION_ELEMENTS_COUNT_ACROSS_TRANSITION = sys.intern('Number of elements across transition')
+_OPTION_ELEMENTS_COUNT_ALONG = sys.intern('Number of elements along')
+_OPTION_SHELL_PROPORTION = sys.intern('Shell element thickness proportion')
+_OPTION_CROP_ACROSS_MAJOR = sys.intern('Crop number of elements across major')
+_OPTION_CROP_ACROSS_MINOR = sys.intern('Crop number of elements across minor')
+_OPTION_CROP_ALONG = sys.intern('Crop number of elements along')
+_OPTION_USE_CROSS_DERIVATIVES = sys.intern('Use cross derivatives')
+_OPTION_REFINE = sys.intern('Refine')
+_OPTION_REFINE_ELEMENTS_COUNT_ACROSS_MAJOR = sys.intern('Refine number of elements across major')
+_OPTION_REFINE_ELEMENTS_COUNT_ALONG = sys.intern('Refine number of elements along')
+
+
+# pre-generated exnode string for the 'Cylinder 1' default central path: the
+# output of exnode_string_from_nodeset_field_parameters for 4 nodes with value,
+# d/ds1, d/ds2, d2/ds1ds2, d/ds3, d2/ds1ds3 along a length 3 straight line, so
+# building the template costs no runtime formatting
+_centralPathMeshEdits = """\
+EX Version: 3
+Region: /
+!#nodeset nodes
+Define node template: node1
+Shape. Dimension=0
+#Fields=1
+1) coordinates, coordinate, rectangular cartesian, real, #Components=3
+ x. #Values=6 (value,d/ds1,d/ds2,d2/ds1ds2,d/ds3,d2/ds1ds3)
+ y. #Values=6 (value,d/ds1,d/ds2,d2/ds1ds2,d/ds3,d2/ds1ds3)
+ z. #Values=6 (value,d/ds1,d/ds2,d2/ds1ds2,d/ds3,d2/ds1ds3)
+Node template: node1
+Node: 1
+  0.000000000000000e+00  0.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00
+  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00
+  0.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00
+Node: 2
+  0.000000000000000e+00  0.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00
+  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00
+  1.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00
+Node: 3
+  0.000000000000000e+00  0.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00
+  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00
+  2.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00
+Node: 4
+  0.000000000000000e+00  0.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00
+  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00
+  3.000000000000000e+00  1.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00  0.000000000000000e+00
+Group name: meshEdits
+!#nodeset nodes
+Node group:
+1..4
+"""
+
+
+# cache of sampled central paths so regenerating with only unrelated options
+# changed, e.g. toggling Refine in a UI, skips the Zinc region round-trip
+_cylinderCentralPathCache = {}
+
+
+def _getCylinderCentralPath(region, centralPath, elementsCountAlong):
+    """
+    Get a CylinderCentralPath for the central path and element count, reusing
+    cached sampling results when the central path settings are unchanged.
+    :param region: Zinc region to define model in.
+    :param centralPath: Central path subscaffold from meshtype_1d_path1.
+    :param elementsCountAlong: Number of elements to sample along the path.
+    :return: CylinderCentralPath, private to the caller.
+    """
+    from scaffoldmaker.utils.cylindermesh import CylinderCentralPath
+    key = (repr(centralPath.toDict()), elementsCountAlong)
+    cylinderCentralPath = _cylinderCentralPathCache.get(key)
+    if cylinderCentralPath is None:
+        if len(_cylinderCentralPathCache) >= 8:
+            _cylinderCentralPathCache.clear()
+        cylinderCentralPath = _cylinderCentralPathCache[key] = \
+            CylinderCentralPath(region, centralPath, elementsCountAlong)
+    # copy so callers can freely modify radii and axes without spoiling the cache
+    return copy.deepcopy(cylinderCentralPath)
 
 
 class MeshType_3d_solidcylinder1(Scaffold_base):
@@ -22,26 +104,47 @@ class MeshType_3d_solidcylinder1(Scaffold_base):
 Generates a solid cylinder using a ShieldMesh of all cube elements,
 with variable numbers of elements in major, minor, shell and axial directions.
     """
-    centralPathDefaultScaffoldPackages = {
-        'Cylinder 1': ScaffoldPackage(MeshType_1d_path1, {
-            'scaffoldSettings': {
-                'Coordinate dimensions': 3,
-                'D2 derivatives': True,
-                'D3 derivatives': True,
-                'Length': 3.0,
-                'Number of elements': 3
-            },
-            'meshEdits': exnode_string_from_nodeset_field_parameters(
-                ['coordinates'],
-                [Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2, Node.VALUE_LABEL_D2_DS1DS2,
-                 Node.VALUE_LABEL_D_DS3, Node.VALUE_LABEL_D2_DS1DS3], [[
-                    (1, [[0.0, 0.0, 0.0], [0.0, 0.0, 1.0], [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0]]),
-                    (2, [[0.0, 0.0, 1.0], [0.0, 0.0, 1.0], [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0]]),
-                    (3, [[0.0, 0.0, 2.0], [0.0, 0.0, 1.0], [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0]]),
-                    (4, [[0.0, 0.0, 3.0], [0.0, 0.0, 1.0], [1.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 0.0]])
-                ]])
-        })
-    }
+    # parameter set names in centralPathDefaultScaffoldPackages order, constant so
+    # queries need not rebuild them from dict keys
+    _centralPathParameterSetNames = ('Cylinder 1',)
+
+    @classmethod
+    def _getCentralPathDefaultScaffoldPackages(cls):
+        """
+        Build the default central path templates on first use so merely importing
+        this module, e.g. when enumerating scaffold types, does not pay for
+        template construction.
+        :return: Dict mapping parameter set name to central path ScaffoldPackage.
+        """
+        packages = cls.__dict__.get('_centralPathDefaultScaffoldPackages')
+        if packages is None:
+            packages = cls._centralPathDefaultScaffoldPackages = {
+                'Cylinder 1': ScaffoldPackage(MeshType_1d_path1, {
+                    'scaffoldSettings': {
+                        'Coordinate dimensions': 3,
+                        'D2 derivatives': True,
+                        'D3 derivatives': True,
+                        'Length': 3.0,
+                        'Number of elements': 3
+                    },
+                    'meshEdits': _centralPathMeshEdits
+                })
+            }
+        return packages
+
+    @classmethod
+    def _getCentralPathBlob(cls):
+        """
+        :return: Pre-serialized 'Cylinder 1' central path template; pickle.loads of
+        this blob is significantly faster than copy.deepcopy for returning fresh
+        copies to repeated getDefaultOptions calls.
+        """
+        blob = cls.__dict__.get('_centralPathBlob')
+        if blob is None:
+            blob = cls._centralPathBlob = pickle.dumps(
+                cls._getCentralPathDefaultScaffoldPackages()['Cylinder 1'],
+                protocol=pickle.HIGHEST_PROTOCOL)
+        return blob
 
     @staticmethod
     def getName():
@@ -49,53 +152,52 @@ with variable numbers of elements in major, minor, shell and axial directions.
 
     @classmethod
     def getDefaultOptions(cls, parameterSetName='Default'):
-        centralPathOption = cls.centralPathDefaultScaffoldPackages['Cylinder 1']
         options = {
-            'Central path': copy.deepcopy(centralPathOption),
-            'Number of elements across major': 4,
-            'Number of elements across minor': 4,
-            'Number of elements across shell': 0,
-            'Number of elements across transition': 1,
-            'Number of elements along': 1,
-            'Shell element thickness proportion': 1.0,
-            'Crop number of elements across major': [0, 0],
-            'Crop number of elements across minor': [0, 0],
-            'Crop number of elements along': [0, 0],
-            'Use cross derivatives': False,
-            'Refine': False,
-            'Refine number of elements across major': 1,
-            'Refine number of elements along': 1
+            _OPTION_CENTRAL_PATH: pickle.loads(cls._getCentralPathBlob()),
+            _OPTION_ELEMENTS_COUNT_ACROSS_MAJOR: 4,
+            _OPTION_ELEMENTS_COUNT_ACROSS_MINOR: 4,
+            _OPTION_ELEMENTS_COUNT_ACROSS_SHELL: 0,
+            _OPTION_ELEMENTS_COUNT_ACROSS_TRANSITION: 1,
+            _OPTION_ELEMENTS_COUNT_ALONG: 1,
+            _OPTION_SHELL_PROPORTION: 1.0,
+            _OPTION_CROP_ACROSS_MAJOR: [0, 0],
+            _OPTION_CROP_ACROSS_MINOR: [0, 0],
+            _OPTION_CROP_ALONG: [0, 0],
+            _OPTION_USE_CROSS_DERIVATIVES: False,
+            _OPTION_REFINE: False,
+            _OPTION_REFINE_ELEMENTS_COUNT_ACROSS_MAJOR: 1,
+            _OPTION_REFINE_ELEMENTS_COUNT_ALONG: 1
         }
         return options
 
     @staticmethod
     def getOrderedOptionNames():
         return [
-            'Central path',
-            'Number of elements across major',
-            'Number of elements across minor',
-            'Number of elements across shell',
-            'Number of elements across transition',
-            'Number of elements along',
-            'Shell element thickness proportion',
-            'Crop number of elements across major',
-            'Crop number of elements across minor',
-            'Crop number of elements along',
-            'Refine',
-            'Refine number of elements across major',
-            'Refine number of elements along'
+            _OPTION_CENTRAL_PATH,
+            _OPTION_ELEMENTS_COUNT_ACROSS_MAJOR,
+            _OPTION_ELEMENTS_COUNT_ACROSS_MINOR,
+            _OPTION_ELEMENTS_COUNT_ACROSS_SHELL,
+            _OPTION_ELEMENTS_COUNT_ACROSS_TRANSITION,
+            _OPTION_ELEMENTS_COUNT_ALONG,
+            _OPTION_SHELL_PROPORTION,
+            _OPTION_CROP_ACROSS_MAJOR,
+            _OPTION_CROP_ACROSS_MINOR,
+            _OPTION_CROP_ALONG,
+            _OPTION_REFINE,
+            _OPTION_REFINE_ELEMENTS_COUNT_ACROSS_MAJOR,
+            _OPTION_REFINE_ELEMENTS_COUNT_ALONG
         ]
 
     @classmethod
     def getOptionValidScaffoldTypes(cls, optionName):
-        if optionName == 'Central path':
+        if optionName == _OPTION_CENTRAL_PATH:
             return [MeshType_1d_path1]
         return []
 
     @classmethod
     def getOptionScaffoldTypeParameterSetNames(cls, optionName, scaffoldType):
-        if optionName == 'Central path':
-            return list(cls.centralPathDefaultScaffoldPackages.keys())
+        if optionName == _OPTION_CENTRAL_PATH:
+            return list(cls._centralPathParameterSetNames)
         assert scaffoldType in cls.getOptionValidScaffoldTypes(optionName), \
             cls.__name__ + '.getOptionScaffoldTypeParameterSetNames.  ' + \
             'Invalid option \'' + optionName + '\' scaffold type ' + scaffoldType.getName()
@@ -111,57 +213,56 @@ with variable numbers of elements in major, minor, shell and axial directions.
             assert parameterSetName in cls.getOptionScaffoldTypeParameterSetNames(optionName, scaffoldType), \
                 'Invalid parameter set ' + str(parameterSetName) + ' for scaffold ' + str(scaffoldType.getName()) + \
                 ' in option ' + str(optionName) + ' of scaffold ' + cls.getName()
-        if optionName == 'Central path':
+        if optionName == _OPTION_CENTRAL_PATH:
             if not parameterSetName:
-                parameterSetName = list(cls.centralPathDefaultScaffoldPackages.keys())[0]
-            return copy.deepcopy(cls.centralPathDefaultScaffoldPackages[parameterSetName])
+                parameterSetName = cls._centralPathParameterSetNames[0]
+            if parameterSetName == 'Cylinder 1':
+                return pickle.loads(cls._getCentralPathBlob())
+            return cls._getCentralPathDefaultScaffoldPackages()[parameterSetName].clone()
         assert False, cls.__name__ + '.getOptionScaffoldPackage:  Option ' + optionName + ' is not a scaffold'
 
     @classmethod
     def checkOptions(cls, options):
-        if not options['Central path'].getScaffoldType() in cls.getOptionValidScaffoldTypes('Central path'):
-            options['Central path'] = cls.getOptionScaffoldPackage('Central path', MeshType_1d_path1)
+        if not options[_OPTION_CENTRAL_PATH].getScaffoldType() in cls.getOptionValidScaffoldTypes(_OPTION_CENTRAL_PATH):
+            options[_OPTION_CENTRAL_PATH] = cls.getOptionScaffoldPackage(_OPTION_CENTRAL_PATH, MeshType_1d_path1)
         dependentChanges = False
 
-        if options['Number of elements across major'] < 4:
-            options['Number of elements across major'] = 4
-        if options['Number of elements across major'] % 2:
-            options['Number of elements across major'] += 1
-
-        if options['Number of elements across minor'] < 4:
-            options['Number of elements across minor'] = 4
-        if options['Number of elements across minor'] % 2:
-            options['Number of elements across minor'] += 1
-        if options['Number of elements along'] < 1:
-            options['Number of elements along'] = 1
-        if options['Number of elements across transition'] < 1:
-            options['Number of elements across transition'] = 1
-        Rcrit = min(options['Number of elements across major']-4, options['Number of elements across minor']-4)//2
-        if options['Number of elements across shell'] + options['Number of elements across transition'] - 1 > Rcrit:
+        # read each option once, clamp in locals, then write back once:
+        # clamp counts at the minimum of 4 and round up to even, branchlessly
+        elementsCountAcrossMajor = max(4, (options[_OPTION_ELEMENTS_COUNT_ACROSS_MAJOR] + 1) & ~1)
+        elementsCountAcrossMinor = max(4, (options[_OPTION_ELEMENTS_COUNT_ACROSS_MINOR] + 1) & ~1)
+        elementsCountAlong = max(1, options[_OPTION_ELEMENTS_COUNT_ALONG])
+        elementsCountAcrossTransition = max(1, options[_OPTION_ELEMENTS_COUNT_ACROSS_TRANSITION])
+        elementsCountAcrossShell = options[_OPTION_ELEMENTS_COUNT_ACROSS_SHELL]
+        Rcrit = min(elementsCountAcrossMajor - 4, elementsCountAcrossMinor - 4)//2
+        if elementsCountAcrossShell + elementsCountAcrossTransition - 1 > Rcrit:
             dependentChanges = True
-            options['Number of elements across shell'] = Rcrit
-            options['Number of elements across transition'] = 1
+            elementsCountAcrossShell = Rcrit
+            elementsCountAcrossTransition = 1
+        options[_OPTION_ELEMENTS_COUNT_ACROSS_MAJOR] = elementsCountAcrossMajor
+        options[_OPTION_ELEMENTS_COUNT_ACROSS_MINOR] = elementsCountAcrossMinor
+        options[_OPTION_ELEMENTS_COUNT_ALONG] = elementsCountAlong
+        options[_OPTION_ELEMENTS_COUNT_ACROSS_TRANSITION] = elementsCountAcrossTransition
+        options[_OPTION_ELEMENTS_COUNT_ACROSS_SHELL] = elementsCountAcrossShell
 
-        if options['Shell element thickness proportion'] < 0.15:
-            options['Shell element thickness proportion'] = 1.0
+        if options[_OPTION_SHELL_PROPORTION] < 0.15:
+            options[_OPTION_SHELL_PROPORTION] = 1.0
 
-        maxelems = [options['Number of elements across major'],
-                    options['Number of elements across minor'],
-                    options['Number of elements along']]
+        maxelems = [elementsCountAcrossMajor, elementsCountAcrossMinor, elementsCountAlong]
 
         cropElements = [
-            options['Crop number of elements across major'],
-            options['Crop number of elements across minor'],
-            options['Crop number of elements along'],
+            options[_OPTION_CROP_ACROSS_MAJOR],
+            options[_OPTION_CROP_ACROSS_MINOR],
+            options[_OPTION_CROP_ALONG],
         ]
 
         for j in [0, 1]:
-            if not (1 + options['Number of elements across shell'] < cropElements[0][j] < maxelems[0]):
-                options['Crop number of elements across major'][j] = 0
-            if not (1 + options['Number of elements across shell'] < cropElements[1][j] < maxelems[1] - 1):
-                options['Crop number of elements across minor'][j] = 0
-            if not (0 <= options['Crop number of elements along'][j] < options['Number of elements along']):
-                options['Crop number of elements along'][j] = 0
+            if not (1 + elementsCountAcrossShell < cropElements[0][j] < maxelems[0]):
+                cropElements[0][j] = 0
+            if not (1 + elementsCountAcrossShell < cropElements[1][j] < maxelems[1] - 1):
+                cropElements[1][j] = 0
+            if not (0 <= cropElements[2][j] < elementsCountAlong):
+                cropElements[2][j] = 0
 
         return dependentChanges
 
@@ -173,20 +274,21 @@ with variable numbers of elements in major, minor, shell and axial directions.
         :param options: Dict containing options. See getDefaultOptions().
         :return: [] empty list of AnnotationGroup, None
         """
+        from cmlibs.utils.zinc.field import findOrCreateFieldCoordinates
+        from scaffoldmaker.utils.cylindermesh import CylinderMesh, CylinderShape, CylinderEnds
 
-        centralPath = options['Central path']
-        elementsCountAcrossMajor = options['Number of elements across major']
-        elementsCountAcrossMinor = options['Number of elements across minor']
-        elementsCountAcrossShell = options['Number of elements across shell']
-        elementsCountAcrossTransition = options['Number of elements across transition']
-        elementsCountAlong = options['Number of elements along']
-        shellProportion = options['Shell element thickness proportion']
-        useCrossDerivatives = options['Use cross derivatives']
+        centralPath = options[_OPTION_CENTRAL_PATH]
+        elementsCountAcrossMajor = options[_OPTION_ELEMENTS_COUNT_ACROSS_MAJOR]
+        elementsCountAcrossMinor = options[_OPTION_ELEMENTS_COUNT_ACROSS_MINOR]
+        elementsCountAcrossShell = options[_OPTION_ELEMENTS_COUNT_ACROSS_SHELL]
+        elementsCountAcrossTransition = options[_OPTION_ELEMENTS_COUNT_ACROSS_TRANSITION]
+        elementsCountAlong = options[_OPTION_ELEMENTS_COUNT_ALONG]
+        shellProportion = options[_OPTION_SHELL_PROPORTION]
 
         cropElements = [
-            options['Crop number of elements across major'],
-            options['Crop number of elements across minor'],
-            options['Crop number of elements along'],
+            options[_OPTION_CROP_ACROSS_MAJOR],
+            options[_OPTION_CROP_ACROSS_MINOR],
+            options[_OPTION_CROP_ALONG],
         ]
         rangeOfRequiredElements = [
             [cropElements[0][0], elementsCountAcrossMajor - cropElements[0][1]],
@@ -197,7 +299,7 @@ with variable numbers of elements in major, minor, shell and axial directions.
         fm = region.getFieldmodule()
         coordinates = findOrCreateFieldCoordinates(fm)
 
-        cylinderCentralPath = CylinderCentralPath(region, centralPath, elementsCountAlong)
+        cylinderCentralPath = _getCylinderCentralPath(region, centralPath, elementsCountAlong)
 
         cylinderShape = CylinderShape.CYLINDER_SHAPE_FULL
 
@@ -213,6 +315,27 @@ with variable numbers of elements in major, minor, shell and axial directions.
         annotationGroups = []
         return annotationGroups, None
 
+    @classmethod
+    def generateBaseMeshes(cls, regions, optionsList):
+        """
+        Generate base meshes for a batch of option sets, e.g. a parameter sweep.
+        Zinc change notifications are deferred for each region, and batch members
+        sharing central path settings and along-element count reuse the same
+        sampled central path via the module cache.
+        :param regions: List of empty Zinc regions to define models in, one per
+        options dict.
+        :param optionsList: List of dicts containing options. See getDefaultOptions().
+        :return: List of (annotationGroups, None) as returned by generateBaseMesh.
+        """
+        from cmlibs.utils.zinc.general import ChangeManager
+        assert len(regions) == len(optionsList), \
+            cls.__name__ + '.generateBaseMeshes:  Mismatched regions and options counts'
+        results = []
+        for region, options in zip(regions, optionsList):
+            with ChangeManager(region.getFieldmodule()):
+                results.append(cls.generateBaseMesh(region, options))
+        return results
+
     @classmethod
     def refineMesh(cls, meshRefinement, options):
         """
@@ -220,7 +343,8 @@ with variable numbers of elements in major, minor, shell and axial directions.
         :param meshRefinement: MeshRefinement, which knows source and target region.
         :param options: Dict containing options. See getDefaultOptions().
         """
+        from scaffoldmaker.utils.meshrefinement import MeshRefinement
         assert isinstance(meshRefinement, MeshRefinement)
-        refineElementsCountAcrossMajor = options['Refine number of elements across major']
-        refineElementsCountAlong = options['Refine number of elements along']
+        refineElementsCountAcrossMajor = options[_OPTION_REFINE_ELEMENTS_COUNT_ACROSS_MAJOR]
+        refineElementsCountAlong = options[_OPTION_REFINE_ELEMENTS_COUNT_ALONG]
         meshRefinement.refineAllElementsCubeStandard3d(refineElementsCountAcrossMajor, refineElementsCountAlong, refineElementsCountAcrossMajor)
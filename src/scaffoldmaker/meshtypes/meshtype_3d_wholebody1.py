@@ -215,7 +215,7 @@ Generates body coordinates using a solid cylinder of all cube elements,
         full = not options['Lower half']
         elementsCountAcrossMajor = options['Number of elements across major']
         if not full:
-            elementsCountAcrossMajor //= 2
+            elementsCountAcrossMajor >>= 1
         elementsCountAcrossMinor = options['Number of elements across minor']
         elementsCountAcrossShell = options['Number of elements across shell']
         elementsCountAcrossTransition = options['Number of elements across transition']
@@ -90,6 +90,38 @@ class ScaffoldPackage:
         """
         return ScaffoldPackage(self._scaffoldType, self.toDict())
 
+    def __copy__(self):
+        """
+        Shallow copy is indistinguishable from clone() as immutable members are
+        shared there anyway; route it to the fast path.
+        """
+        return self.clone()
+
+    def clone(self):
+        """
+        Clone object in deserialised, pre-generated form.
+        Cheaper than copy.deepcopy: shares the scaffold type class and immutable
+        meshEdits bytes, and skips re-merging scaffold settings with defaults.
+        :return: New ScaffoldPackage with the same settings as this one.
+        """
+        clone = ScaffoldPackage.__new__(ScaffoldPackage)
+        clone._scaffoldType = self._scaffoldType
+        # settings may contain nested ScaffoldPackage values so still need deep copy
+        clone._scaffoldSettings = copy.deepcopy(self._scaffoldSettings)
+        clone._rotation = list(self._rotation)
+        clone._scale = list(self._scale)
+        clone._translation = list(self._translation)
+        clone._meshEdits = self._meshEdits  # bytes: immutable, safe to share
+        clone._isGenerated = False
+        clone._autoAnnotationGroups = []
+        self.updateUserAnnotationGroups()
+        clone._userAnnotationGroupsDict = copy.deepcopy(self._userAnnotationGroupsDict)
+        clone._userAnnotationGroups = []
+        clone._region = None
+        clone._constructionObject = None
+        clone._nextNodeIdentifier = 1
+        return clone
+
     def toDict(self):
         """
         Encodes object into a dictionary for JSON serialisation.
@@ -5,7 +5,7 @@ a solid truncated cone. It also can be used for transition from a 2D base to ano
 """
 
 import math
-from enum import Enum
+from enum import Enum, IntEnum
 
 from cmlibs.utils.zinc.finiteelement import getMaximumNodeIdentifier, getMaximumElementIdentifier
 from cmlibs.zinc.field import Field
@@ -33,7 +33,8 @@ class CylinderType(Enum):
     CYLINDER_TAPERED = 2  # cylinder radius changes along the cylinder axis
 
 
-class ConeBaseProgression(Enum):
+class ConeBaseProgression(IntEnum):
+    # IntEnum so equality tests in per-element radius loops use C-level int comparison
     GEOMETRIC_PROGRESSION = 1  # geometric sequence decrease for major radius of bases
     ARITHMETIC_PROGRESSION = 2  # arithmetic sequence decrease for major radius of bases
 
@@ -351,14 +352,19 @@ class CylinderMesh:
 
             elementsMinor = self._elementsCountAcrossMinor//2 - self._elementsCountAcrossShell*(1-self._shellProportion)
             elementsMajor = self._elementsCountUp - self._elementsCountAcrossShell*(1-self._shellProportion)
+            coreMinorFactor = 1 - self._shellProportion*self._elementsCountAcrossShell/elementsMinor
+            coreMajorFactor = 1 - self._shellProportion*self._elementsCountAcrossShell/elementsMajor
             for n3 in range(self._elementsCountAlong + 1):
-                self._coreMinorRadii.append((1-self._shellProportion*self._elementsCountAcrossShell/elementsMinor)*self._minorRadii[n3])
-                self._coreMajorRadii.append((1-self._shellProportion*self._elementsCountAcrossShell/elementsMajor)*self._majorRadii[n3])
+                self._coreMinorRadii.append(coreMinorFactor*self._minorRadii[n3])
+                self._coreMajorRadii.append(coreMajorFactor*self._majorRadii[n3])
 
         if self._cylinderType == CylinderType.CYLINDER_TAPERED and not cylinderCentralPath:
             centre = self._base._centre
             majorRadius = self._base._majorRadius
             minorRadius = self._base._minorRadius
+            # loop-invariant step along the cylinder axis
+            unitAlongAxis = vector.normalise(self._base._alongAxis)
+            alongStep = [arcLengthAlong * c for c in unitAlongAxis]
             for n3 in range(1, self._elementsCountAlong+1):
                 majorRadius, majorAxis = computeNextRadius(majorRadius, self._base._majorAxis,
                                                            self._tapered.majorRatio,
@@ -366,7 +372,7 @@ class CylinderMesh:
                 minorRadius, minorAxis = computeNextRadius(minorRadius, self._base._minorAxis,
                                                            self._tapered.minorRatio,
                                                            self._tapered.minorProgressionMode)
-                centre = computeNextCentre(centre, arcLengthAlong, self._base._alongAxis)
+                centre = [centre[c] + alongStep[c] for c in range(3)]
                 self._centres[n3] = centre
                 self._majorAxis[n3] = majorAxis
                 self._minorAxis[n3] = minorAxis
@@ -862,5 +868,6 @@ def computeNextCentre(centre, arcLength, axis):
     :param centre: the start centre.
     :return: next centre coordinates.
     """
-    centre = [centre[c]+arcLength * vector.normalise(axis)[c] for c in range(3)]
+    unitAxis = vector.normalise(axis)
+    centre = [centre[c] + arcLength * unitAxis[c] for c in range(3)]
     return centre
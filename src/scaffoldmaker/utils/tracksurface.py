@@ -2,9 +2,10 @@
 Utility class for representing surfaces on which features can be located.
 """
 
-import copy
 from enum import Enum
 import math
+
+import numpy as np
 from cmlibs.maths.vectorops import add, cross, dot, magnitude, mult, normalize, sub
 from cmlibs.utils.zinc.general import ChangeManager
 from cmlibs.utils.zinc.field import find_or_create_field_coordinates, find_or_create_field_group
@@ -12,10 +13,9 @@ from cmlibs.utils.zinc.finiteelement import get_maximum_element_identifier, get_
 from cmlibs.zinc.element import Element, Elementbasis
 from cmlibs.zinc.field import Field, FieldGroup
 from cmlibs.zinc.node import Node
-from scaffoldmaker.utils.interpolation import computeCubicHermiteArcLength, evaluateCoordinatesOnCurve, \
-    getCubicHermiteArcLength, getCubicHermiteBasis, getCubicHermiteBasisDerivatives, getCubicHermiteCurvatureSimple, \
-    incrementXiOnLine, interpolateCubicHermite, \
-    interpolateHermiteLagrangeDerivative, interpolateLagrangeHermiteDerivative, sampleCubicHermiteCurves, \
+from scaffoldmaker.utils.interpolation import evaluateCoordinatesOnCurve, \
+    getCubicHermiteArcLength, getCubicHermiteCurvatureSimple, \
+    incrementXiOnLine, interpolateHermiteLagrangeDerivative, interpolateLagrangeHermiteDerivative, sampleCubicHermiteCurves, \
     sampleCubicHermiteCurvesSmooth, smoothCubicHermiteDerivativesLine, smoothCubicHermiteDerivativesLoop, \
     updateCurveLocationToFaceNumber
 from scaffoldmaker.utils import vector
@@ -26,6 +26,8 @@ class TrackSurfacePosition:
     Position on TrackSurface. Create with createPosition~ method of TrackSurface.
     """
 
+    __slots__ = ('e1', 'e2', 'xi1', 'xi2')
+
     def __init__(self, e1, e2, xi1, xi2):
         """
         :param e1, e2: Element index in directions 1 and 2, starting at 0.
@@ -39,11 +41,73 @@ class TrackSurfacePosition:
     def __str__(self):
         return 'element (' + str(self.e1) + ',' + str(self.e2) + ') xi (' + str(self.xi1) + ',' + str(self.xi2) + ')'
 
+    def __copy__(self):
+        return TrackSurfacePosition(self.e1, self.e2, self.xi1, self.xi2)
+
+    def clone(self):
+        """
+        Clone position without the dispatch overhead of the copy module.
+        """
+        return TrackSurfacePosition(self.e1, self.e2, self.xi1, self.xi2)
+
     def offsetXi(self, dxi1, dxi2):
         self.xi1 += dxi1
         self.xi2 += dxi2
 
 
+def _computeBasisProducts(xi1, xi2):
+    """
+    Compute all bicubic Hermite basis tensor products at (xi1, xi2): value,
+    d/dxi1 and d/dxi2 weights for the 4 local node x, d1, d2, d12 parameters.
+    Cubic Hermite basis from interpolation.getCubicHermiteBasis is inlined here.
+    :return: Tuple of 12 lists of 4 weights each:
+    fx, fd1, fd2, fd12, d1fx, d1fd1, d1fd2, d1fd12, d2fx, d2fd1, d2fd2, d2fd12.
+    """
+    xi1_2 = xi1*xi1
+    xi1_3 = xi1_2*xi1
+    f1x1 = 1.0 - 3.0*xi1_2 + 2.0*xi1_3
+    f1d1 = xi1 - 2.0*xi1_2 + xi1_3
+    f1x2 = 3.0*xi1_2 - 2.0*xi1_3
+    f1d2 = -xi1_2 + xi1_3
+    df1x1 = -6.0*xi1 + 6.0*xi1_2
+    df1d1 = 1.0 - 4.0*xi1 + 3.0*xi1_2
+    df1x2 = 6.0*xi1 - 6.0*xi1_2
+    df1d2 = -2.0*xi1 + 3.0*xi1_2
+    xi2_2 = xi2*xi2
+    xi2_3 = xi2_2*xi2
+    f2x1 = 1.0 - 3.0*xi2_2 + 2.0*xi2_3
+    f2d1 = xi2 - 2.0*xi2_2 + xi2_3
+    f2x2 = 3.0*xi2_2 - 2.0*xi2_3
+    f2d2 = -xi2_2 + xi2_3
+    df2x1 = -6.0*xi2 + 6.0*xi2_2
+    df2d1 = 1.0 - 4.0*xi2 + 3.0*xi2_2
+    df2x2 = 6.0*xi2 - 6.0*xi2_2
+    df2d2 = -2.0*xi2 + 3.0*xi2_2
+    return ([f1x1*f2x1, f1x2*f2x1, f1x1*f2x2, f1x2*f2x2],
+            [f1d1*f2x1, f1d2*f2x1, f1d1*f2x2, f1d2*f2x2],
+            [f1x1*f2d1, f1x2*f2d1, f1x1*f2d2, f1x2*f2d2],
+            [f1d1*f2d1, f1d2*f2d1, f1d1*f2d2, f1d2*f2d2],
+            [df1x1*f2x1, df1x2*f2x1, df1x1*f2x2, df1x2*f2x2],
+            [df1d1*f2x1, df1d2*f2x1, df1d1*f2x2, df1d2*f2x2],
+            [df1x1*f2d1, df1x2*f2d1, df1x1*f2d2, df1x2*f2d2],
+            [df1d1*f2d1, df1d2*f2d1, df1d1*f2d2, df1d2*f2d2],
+            [f1x1*df2x1, f1x2*df2x1, f1x1*df2x2, f1x2*df2x2],
+            [f1d1*df2x1, f1d2*df2x1, f1d1*df2x2, f1d2*df2x2],
+            [f1x1*df2d1, f1x2*df2d1, f1x1*df2d2, f1x2*df2d2],
+            [f1d1*df2d1, f1d2*df2d1, f1d1*df2d2, f1d2*df2d2])
+
+
+# memoized basis products: iterative solvers revisit identical (xi1, xi2) pairs
+# at element corners, centres and jolt offsets
+_basisProductsCache = {}
+_BASIS_PRODUCTS_CACHE_SIZE = 4096
+
+# cubic Hermite basis weights at the fixed xi used for intersection curve loop detection
+_xiLoopSampleBasis = [
+    (1.0 - 3.0*xi*xi + 2.0*xi*xi*xi, xi - 2.0*xi*xi + xi*xi*xi, 3.0*xi*xi - 2.0*xi*xi*xi, -xi*xi + xi*xi*xi)
+    for xi in (0.25, 0.5, 0.75, 1.0)]
+
+
 class TrackSurface:
     """
     A surface description on which positions can be stored and tracked for
@@ -72,18 +136,70 @@ class TrackSurface:
         self._nd1 = nd1
         self._nd2 = nd2
         self._nd12 = nd12
+        # pack parameters into one flat row per node (x, d1, d2[, d12]) so the
+        # evaluate kernel makes a single indexed load per local node
+        if nd12:
+            self._nodeParameters = [nx[n] + nd1[n] + nd2[n] + nd12[n] for n in range(len(nx))]
+        else:
+            self._nodeParameters = [nx[n] + nd1[n] + nd2[n] for n in range(len(nx))]
+        # bind the evaluate variant for this surface: the common no-cross case
+        # skips all cross derivative work, and the instance attribute shadows
+        # the class method so the hot path has no wrapper dispatch
+        self._evaluateCoordinatesImpl = \
+            self._evaluateCoordinatesCross if nd12 else self._evaluateCoordinatesRegular
+        self.evaluateCoordinates = self._evaluateCoordinatesImpl
         self._loop1 = loop1
-        # get max range for tolerances
-        self._xMin = copy.copy(nx[0])
-        self._xMax = copy.copy(nx[0])
-        for x in nx:
-            for c in range(3):
-                s = x[c]
-                if s < self._xMin[c]:
-                    self._xMin[c] = s
-                elif s > self._xMax[c]:
-                    self._xMax[c] = s
+        # bind the advance variant for this surface topology
+        self._advancePosition = self._advancePositionLoop if loop1 else self._advancePositionNoLoop
+        # table of the 4 local node indexes for each element, elements across
+        # direction 1 fastest, with any loop1 wrapping baked in
+        nodesCount1 = elementsCount1 if loop1 else elementsCount1 + 1
+        self._elementNodeIndexes = []
+        for e2 in range(elementsCount2):
+            nid0 = e2 * nodesCount1
+            for e1 in range(elementsCount1):
+                n1 = nid0 + e1
+                n2 = nid0 if (loop1 and ((e1 + 1) == elementsCount1)) else n1 + 1
+                self._elementNodeIndexes.append((n1, n2, n1 + nodesCount1, n2 + nodesCount1))
+        # (N, 3) numpy copy of nx for vectorized scans, built on first use;
+        # the plain lists above remain authoritative
+        self._nxArray = None
+        # (E, 3) element centre coordinates for nearest-sample scans, built on first use
+        self._centreArray = None
+        # get max range for tolerances, using C-level min/max over transposed components
+        self._xMin = [min(col) for col in zip(*nx)]
+        self._xMax = [max(col) for col in zip(*nx)]
         self._xRange = [self._xMax[c] - self._xMin[c] for c in range(3)]
+        # fixed after construction, so derive coordinate tolerance once
+        self._maxXRange = max(self._xRange)
+        self._xTol = 1.0E-6 * self._maxXRange
+        # reciprocals for converting xi increments to proportions in the advance hot path;
+        # only used where the result is clamped or wrapped, as multiplying by a reciprocal
+        # can differ from division in the last bit
+        self._invElementsCount1 = 1.0 / elementsCount1
+        self._invElementsCount2 = 1.0 / elementsCount2
+
+    def _getCoordinatesArray(self):
+        """
+        Get node coordinates as an (N, 3) numpy array for vectorized scans.
+        :return: numpy array of shape (number of nodes, 3).
+        """
+        if self._nxArray is None:
+            self._nxArray = np.array(self._nx, dtype=np.float64)
+        return self._nxArray
+
+    def _getCentreArray(self):
+        """
+        Get element centre coordinates as an (elementsCount2*elementsCount1, 3) numpy array,
+        in order of elements across direction 1, rows of direction 2.
+        :return: numpy array of shape (number of elements, 3).
+        """
+        if self._centreArray is None:
+            evaluateCoordinates = self.evaluateCoordinates
+            self._centreArray = np.array(
+                [evaluateCoordinates(TrackSurfacePosition(e1, e2, 0.5, 0.5))
+                 for e2 in range(self._elementsCount2) for e1 in range(self._elementsCount1)])
+        return self._centreArray
 
     def getElementsCount1(self):
         return self._elementsCount1
@@ -108,14 +224,14 @@ class TrackSurface:
         for n2 in range(nodesCount2):
             for n1 in range(nodesCount1):
                 oi = n2*nodesCount1 + self._elementsCount1 - n1
-                ox = copy.deepcopy(self._nx[oi])
-                od1 = copy.deepcopy(self._nd1[oi])
-                od2 = copy.deepcopy(self._nd2[oi])
+                ox = self._nx[oi]
+                od1 = self._nd1[oi]
+                od2 = self._nd2[oi]
                 nx.append([-ox[0],  ox[1],  ox[2]])
                 nd1.append([od1[0], -od1[1], -od1[2]])
                 nd2.append([-od2[0], od2[1], od2[2]])
                 if nd12:
-                    od12 = copy.deepcopy(self._nd12[oi])
+                    od12 = self._nd12[oi]
                     nd12.append([od12[0], od12[1], od12[2]])  # need to check
         return TrackSurface(self._elementsCount1, self._elementsCount2, nx, nd1, nd2, nd12, loop1=self._loop1)
 
@@ -166,60 +282,133 @@ class TrackSurface:
         :return: If derivatives is False: coordinates [x, y, z].
         If derivatives is True: coordinates, derivative1, derivative2.
         """
-        nodesCount1 = self._elementsCount1 if self._loop1 else self._elementsCount1 + 1
-        e1 = position.e1 % self._elementsCount1  # to handle loop1
-        nx = self._nx
-        nd1 = self._nd1
-        nd2 = self._nd2
-        nd12 = self._nd12
-        nid0 = position.e2 * nodesCount1
-        n1 = nid0 + e1
-        n2 = nid0 if (self._loop1 and ((e1 + 1) == self._elementsCount1)) else n1 + 1
-        n3 = n1 + nodesCount1
-        n4 = n2 + nodesCount1
-        nid = [n1, n2, n3, n4]
-        f1x1, f1d1, f1x2, f1d2 = getCubicHermiteBasis(position.xi1)
-        f2x1, f2d1, f2x2, f2d2 = getCubicHermiteBasis(position.xi2)
-        fx = [f1x1*f2x1, f1x2*f2x1, f1x1*f2x2, f1x2*f2x2]
-        fd1 = [f1d1*f2x1, f1d2*f2x1, f1d1*f2x2, f1d2*f2x2]
-        fd2 = [f1x1*f2d1, f1x2*f2d1, f1x1*f2d2, f1x2*f2d2]
-        fd12 = [f1d1*f2d1, f1d2*f2d1, f1d1*f2d2, f1d2*f2d2] if nd12 else None
-        coordinates = []
-        for c in range(3):
-            x = 0.0
-            for ln in range(4):
-                gn = nid[ln]
-                x += fx[ln]*nx[gn][c] + fd1[ln]*nd1[gn][c] + fd2[ln]*nd2[gn][c]
-                if nd12:
-                    x += fd12[ln] * nd12[gn][c]
-            coordinates.append(x)
+        return self._evaluateCoordinatesImpl(position, derivatives)
+
+    def _getElementNodeParameters(self, position: TrackSurfacePosition):
+        """
+        Get packed parameter rows for the 4 local nodes of the element at position.
+        :return: List of 4 flat node parameter rows.
+        """
+        elementsCount1 = self._elementsCount1
+        n1, n2, n3, n4 = self._elementNodeIndexes[
+            position.e2 * elementsCount1 + (position.e1 % elementsCount1)]
+        nodeParameters = self._nodeParameters
+        return [nodeParameters[n1], nodeParameters[n2], nodeParameters[n3], nodeParameters[n4]]
+
+    def _evaluateCoordinatesRegular(self, position: TrackSurfacePosition, derivatives=False):
+        """
+        Implementation of evaluateCoordinates specialized for no cross derivatives,
+        the common case: all cross-term work is absent from the straight-line code.
+        """
+        pn = self._getElementNodeParameters(position)
+        key = (position.xi1, position.xi2)
+        products = _basisProductsCache.get(key)
+        if products is None:
+            if len(_basisProductsCache) >= _BASIS_PRODUCTS_CACHE_SIZE:
+                _basisProductsCache.clear()
+            products = _basisProductsCache[key] = _computeBasisProducts(key[0], key[1])
+        fx = products[0]
+        fd1 = products[1]
+        fd2 = products[2]
+        x = y = z = 0.0
+        for ln in range(4):
+            p = pn[ln]
+            f = fx[ln]
+            g = fd1[ln]
+            h = fd2[ln]
+            x += f*p[0] + g*p[3] + h*p[6]
+            y += f*p[1] + g*p[4] + h*p[7]
+            z += f*p[2] + g*p[5] + h*p[8]
+        coordinates = [x, y, z]
         if not derivatives:
             return coordinates
-        df1x1, df1d1, df1x2, df1d2 = getCubicHermiteBasisDerivatives(position.xi1)
-        d1fx = [df1x1*f2x1, df1x2*f2x1, df1x1*f2x2, df1x2*f2x2]
-        d1fd1 = [df1d1*f2x1, df1d2*f2x1, df1d1*f2x2, df1d2*f2x2]
-        d1fd2 = [df1x1*f2d1, df1x2*f2d1, df1x1*f2d2, df1x2*f2d2]
-        d1fd12 = [df1d1*f2d1, df1d2*f2d1, df1d1*f2d2, df1d2*f2d2] if nd12 else None
-        df2x1, df2d1, df2x2, df2d2 = getCubicHermiteBasisDerivatives(position.xi2)
-        d2fx = [f1x1*df2x1, f1x2*df2x1, f1x1*df2x2, f1x2*df2x2]
-        d2fd1 = [f1d1*df2x1, f1d2*df2x1, f1d1*df2x2, f1d2*df2x2]
-        d2fd2 = [f1x1*df2d1, f1x2*df2d1, f1x1*df2d2, f1x2*df2d2]
-        d2fd12 = [f1d1*df2d1, f1d2*df2d1, f1d1*df2d2, f1d2*df2d2] if nd12 else None
-        derivative1 = []
-        derivative2 = []
-        for c in range(3):
-            d1 = 0.0
-            d2 = 0.0
-            for ln in range(4):
-                gn = nid[ln]
-                d1 += d1fx[ln]*nx[gn][c] + d1fd1[ln]*nd1[gn][c] + d1fd2[ln]*nd2[gn][c]
-                d2 += d2fx[ln]*nx[gn][c] + d2fd1[ln]*nd1[gn][c] + d2fd2[ln]*nd2[gn][c]
-                if nd12:
-                    d1 += d1fd12[ln]*nd12[gn][c]
-                    d2 += d2fd12[ln]*nd12[gn][c]
-            derivative1.append(d1)
-            derivative2.append(d2)
-        return coordinates, derivative1, derivative2
+        d1fx = products[4]
+        d1fd1 = products[5]
+        d1fd2 = products[6]
+        d2fx = products[8]
+        d2fd1 = products[9]
+        d2fd2 = products[10]
+        d1x = d1y = d1z = d2x = d2y = d2z = 0.0
+        for ln in range(4):
+            p = pn[ln]
+            fa = d1fx[ln]
+            fb = d1fd1[ln]
+            fc = d1fd2[ln]
+            ga = d2fx[ln]
+            gb = d2fd1[ln]
+            gc = d2fd2[ln]
+            d1x += fa*p[0] + fb*p[3] + fc*p[6]
+            d1y += fa*p[1] + fb*p[4] + fc*p[7]
+            d1z += fa*p[2] + fb*p[5] + fc*p[8]
+            d2x += ga*p[0] + gb*p[3] + gc*p[6]
+            d2y += ga*p[1] + gb*p[4] + gc*p[7]
+            d2z += ga*p[2] + gb*p[5] + gc*p[8]
+        return coordinates, [d1x, d1y, d1z], [d2x, d2y, d2z]
+
+    def _evaluateCoordinatesCross(self, position: TrackSurfacePosition, derivatives=False):
+        """
+        Implementation of evaluateCoordinates for surfaces with cross derivatives.
+        """
+        pn = self._getElementNodeParameters(position)
+        key = (position.xi1, position.xi2)
+        products = _basisProductsCache.get(key)
+        if products is None:
+            if len(_basisProductsCache) >= _BASIS_PRODUCTS_CACHE_SIZE:
+                _basisProductsCache.clear()
+            products = _basisProductsCache[key] = _computeBasisProducts(key[0], key[1])
+        fx, fd1, fd2, fd12, d1fx, d1fd1, d1fd2, d1fd12, d2fx, d2fd1, d2fd2, d2fd12 = products
+        x = y = z = 0.0
+        for ln in range(4):
+            p = pn[ln]
+            f = fx[ln]
+            g = fd1[ln]
+            h = fd2[ln]
+            k = fd12[ln]
+            x += f*p[0] + g*p[3] + h*p[6]
+            y += f*p[1] + g*p[4] + h*p[7]
+            z += f*p[2] + g*p[5] + h*p[8]
+            x += k*p[9]
+            y += k*p[10]
+            z += k*p[11]
+        coordinates = [x, y, z]
+        if not derivatives:
+            return coordinates
+        d1x = d1y = d1z = d2x = d2y = d2z = 0.0
+        for ln in range(4):
+            p = pn[ln]
+            fa = d1fx[ln]
+            fb = d1fd1[ln]
+            fc = d1fd2[ln]
+            fk = d1fd12[ln]
+            ga = d2fx[ln]
+            gb = d2fd1[ln]
+            gc = d2fd2[ln]
+            gk = d2fd12[ln]
+            d1x += fa*p[0] + fb*p[3] + fc*p[6]
+            d1y += fa*p[1] + fb*p[4] + fc*p[7]
+            d1z += fa*p[2] + fb*p[5] + fc*p[8]
+            d2x += ga*p[0] + gb*p[3] + gc*p[6]
+            d2y += ga*p[1] + gb*p[4] + gc*p[7]
+            d2z += ga*p[2] + gb*p[5] + gc*p[8]
+            d1x += fk*p[9]
+            d1y += fk*p[10]
+            d1z += fk*p[11]
+            d2x += gk*p[9]
+            d2y += gk*p[10]
+            d2z += gk*p[11]
+        return coordinates, [d1x, d1y, d1z], [d2x, d2y, d2z]
+
+    def evaluateCoordinatesOnProportions(self, proportions, derivatives=False):
+        """
+        Evaluate coordinates on surface at a whole sample of proportions in one call,
+        avoiding per-point dispatch in curve sampling loops.
+        :param proportions: List of (proportion1, proportion2) pairs.
+        :param derivatives: Set to True to calculate and return derivatives w.r.t. element xi.
+        :return: List of evaluateCoordinates results at each proportion.
+        """
+        createPositionProportion = self.createPositionProportion
+        evaluateCoordinates = self.evaluateCoordinates
+        return [evaluateCoordinates(createPositionProportion(p1, p2), derivatives) for p1, p2 in proportions]
 
     class HermiteCurveMode(Enum):
         SMOOTH = 1    # smooth variation of element size between end derivatives
@@ -241,8 +430,6 @@ class TrackSurface:
         :param elementsCount:  Number of elements out.
         :return: nx[], nd1[], nd2[], nd3[], nProportions[]
         """
-        # print('createHermiteCurvePoints', aProportion1, aProportion2, bProportion1, bProportion2, elementsCount,
-        #       derivativeStart, derivativeEnd)
         if derivativeStart:
             position = self.createPositionProportion(aProportion1, aProportion2)
             _, sd1, sd2 = self.evaluateCoordinates(position, derivatives=True)
@@ -252,8 +439,6 @@ class TrackSurface:
             derivativeMagnitudeStart = math.sqrt(dp1Start*dp1Start + dp2Start*dp2Start)
             dp1Start *= elementsCount
             dp2Start *= elementsCount
-            # print('start delta_xi1', delta_xi1, 'delta_xi2', delta_xi2)
-            # print('dp1Start', dp1Start, 'dp2Start', dp2Start)
         if derivativeEnd:
             position = self.createPositionProportion(bProportion1, bProportion2)
             _, sd1, sd2 = self.evaluateCoordinates(position, derivatives=True)
@@ -263,8 +448,6 @@ class TrackSurface:
             derivativeMagnitudeEnd = math.sqrt(dp1End*dp1End + dp2End*dp2End)
             dp1End *= elementsCount
             dp2End *= elementsCount
-            # print('end delta_xi1', delta_xi1, 'delta_xi2', delta_xi2)
-            # print('dp1End', dp1End, 'dp2End', dp2End)
         if not derivativeStart:
             if derivativeEnd:
                 dp1Start, dp2Start = interpolateLagrangeHermiteDerivative(
@@ -281,7 +464,6 @@ class TrackSurface:
                 dp1End = bProportion1 - aProportion1
                 dp2End = bProportion2 - aProportion2
             derivativeMagnitudeEnd = math.sqrt(dp1End*dp1End + dp2End*dp2End)/elementsCount
-        # print('derivativeMagnitudeStart', derivativeMagnitudeStart, 'derivativeMagnitudeEnd', derivativeMagnitudeEnd)
         proportions, dproportions = sampleCubicHermiteCurvesSmooth(
             [[aProportion1, aProportion2], [bProportion1, bProportion2]],
             [[dp1Start, dp2Start], [dp1End, dp2End]],
@@ -304,21 +486,19 @@ class TrackSurface:
             proportions, dproportions = sampleCubicHermiteCurves(
                 proportions, dproportions, elementsCount,
                 addLengthStart, addLengthEnd, lengthFractionStart, lengthFractionEnd)[0:2]
-        # print(' proportions', proportions)
-        # print('dproportions', dproportions)
         nx = []
         nd1 = []
         nd2 = []
         nd3 = []
+        evaluations = self.evaluateCoordinatesOnProportions(proportions, derivatives=True)
         for n in range(0, elementsCount + 1):
-            position = self.createPositionProportion(proportions[n][0], proportions[n][1])
-            x, sd1, sd2 = self.evaluateCoordinates(position, derivatives=True)
+            x, sd1, sd2 = evaluations[n]
             f1 = dproportions[n][0] * self._elementsCount1
             f2 = dproportions[n][1] * self._elementsCount2
             d1 = [(f1*sd1[c] + f2*sd2[c]) for c in range(3)]
             d3 = vector.crossproduct3(sd1, sd2)
             # handle zero magnitude of d3
-            mag = math.sqrt(sum(d3[c]*d3[c] for c in range(3)))
+            mag = math.sqrt(d3[0]*d3[0] + d3[1]*d3[1] + d3[2]*d3[2])
             if mag > 0.0:
                 d3 = [(d3[c]/mag) for c in range(3)]
             d2 = vector.crossproduct3(d3, d1)
@@ -326,7 +506,6 @@ class TrackSurface:
             nd2.append(d2)
             nd1.append(d1)
             nd3.append(d3)
-        # print('createHermiteCurvePoints end \n nx', nx,'\nnd1',nd1,'\nnd2',nd2,'\nnd3',nd3)
         return nx, nd1, nd2, nd3, proportions
 
     def resampleHermiteCurvePointsSmooth(self, nx, nd1, nd2, nd3, nProportions,
@@ -336,18 +515,22 @@ class TrackSurface:
         :return: nx[], nd1[], nd2[], nd3[], nProportions[]
         """
         elementsCount = len(nx) - 1
-        # print(nx, nd1, elementsCount, derivativeMagnitudeStart, derivativeMagnitudeEnd)
         nx, nd1 = sampleCubicHermiteCurvesSmooth(
             nx, nd1, elementsCount, derivativeMagnitudeStart, derivativeMagnitudeEnd)[0:2]
         mag2 = vector.magnitude(nd2[0])
         if mag2 > 0.0:
             nd2[0] = vector.setMagnitude(nd2[0], vector.magnitude(nd1[0]))
+        findNearestPosition = self.findNearestPosition
+        createPositionProportion = self.createPositionProportion
+        evaluateCoordinates = self.evaluateCoordinates
         for n in range(1, elementsCount):
-            p = self.findNearestPosition(nx[n], self.createPositionProportion(*nProportions[n]))
+            p = findNearestPosition(nx[n], createPositionProportion(*nProportions[n]))
             nProportions[n] = self.getProportion(p)
-            _, sd1, sd2 = self.evaluateCoordinates(p, derivatives=True)
-            _, d2, d3 = calculate_surface_axes(sd1, sd2, vector.normalise(nd1[n]))
-            nd2[n] = vector.setMagnitude(d2, vector.magnitude(nd1[n]))
+            _, sd1, sd2 = evaluateCoordinates(p, derivatives=True)
+            d1n = nd1[n]
+            mag1 = math.sqrt(d1n[0]*d1n[0] + d1n[1]*d1n[1] + d1n[2]*d1n[2])
+            _, d2, d3 = calculate_surface_axes(sd1, sd2, [c / mag1 for c in d1n])
+            nd2[n] = vector.setMagnitude(d2, mag1)
             nd3[n] = d3
         mag2 = vector.magnitude(nd2[-1])
         if mag2 > 0.0:
@@ -401,9 +584,10 @@ class TrackSurface:
             return [0.0, 1.0]
         return None
 
-    def _advancePosition(self, startPosition, dxi1, dxi2, MAX_MAG_DXI=0.5):
+    def _advancePositionNoLoop(self, startPosition, dxi1, dxi2, MAX_MAG_DXI=0.5):
         """
         Advance position by element delta xi to maximum change of xi coordinates or boundary.
+        Variant for loop1 == False, bound as _advancePosition in __init__.
         :param startPosition: Start position.
         :param dxi1: Increment in xi1.
         :param dxi2: Increment in xi2.
@@ -413,26 +597,51 @@ class TrackSurface:
         startProportion1, startProportion2 = self.getProportion(startPosition)
         adxi1 = dxi1
         adxi2 = dxi2
-        magDxi = magnitude([dxi1, dxi2])
+        magDxi = math.sqrt(dxi1*dxi1 + dxi2*dxi2)
         if magDxi > MAX_MAG_DXI:
             factor = MAX_MAG_DXI / magDxi
             adxi1 *= factor
             adxi2 *= factor
-        proportion1 = startProportion1 + adxi1 / self._elementsCount1
-        proportion2 = startProportion2 + adxi2 / self._elementsCount2
+        proportion1 = startProportion1 + adxi1 * self._invElementsCount1
+        proportion2 = startProportion2 + adxi2 * self._invElementsCount2
         onBoundary = 0
-        if self._loop1:
-            if proportion1 < 0.0:
-                proportion1 += 2.0
-            elif proportion1 > 2.0:
-                proportion1 -= 2.0
-        else:
-            if proportion1 < 0.0:
-                proportion1 = 0.0
-                onBoundary = 1
-            elif proportion1 > 1.0:
-                proportion1 = 1.0
-                onBoundary = 1
+        if proportion1 < 0.0:
+            proportion1 = 0.0
+            onBoundary = 1
+        elif proportion1 > 1.0:
+            proportion1 = 1.0
+            onBoundary = 1
+        if proportion2 < 0.0:
+            proportion2 = 0.0
+            onBoundary = 2
+        elif proportion2 > 1.0:
+            proportion2 = 1.0
+            onBoundary = 2
+        if onBoundary:
+            adxi1 = (proportion1 - startProportion1) * self._elementsCount1
+            adxi2 = (proportion2 - startProportion2) * self._elementsCount2
+        return self.createPositionProportion(proportion1, proportion2), onBoundary, adxi1, adxi2
+
+    def _advancePositionLoop(self, startPosition, dxi1, dxi2, MAX_MAG_DXI=0.5):
+        """
+        Variant of _advancePositionNoLoop for loop1 == True: wraps proportion 1
+        instead of clamping it to a boundary.
+        """
+        startProportion1, startProportion2 = self.getProportion(startPosition)
+        adxi1 = dxi1
+        adxi2 = dxi2
+        magDxi = math.sqrt(dxi1*dxi1 + dxi2*dxi2)
+        if magDxi > MAX_MAG_DXI:
+            factor = MAX_MAG_DXI / magDxi
+            adxi1 *= factor
+            adxi2 *= factor
+        proportion1 = startProportion1 + adxi1 * self._invElementsCount1
+        proportion2 = startProportion2 + adxi2 * self._invElementsCount2
+        onBoundary = 0
+        if proportion1 < 0.0:
+            proportion1 += 2.0
+        elif proportion1 > 2.0:
+            proportion1 -= 2.0
         if proportion2 < 0.0:
             proportion2 = 0.0
             onBoundary = 2
@@ -440,12 +649,11 @@ class TrackSurface:
             proportion2 = 1.0
             onBoundary = 2
         if onBoundary:
-            if not self._loop1:
-                adxi1 = (proportion1 - startProportion1) * self._elementsCount1
             adxi2 = (proportion2 - startProportion2) * self._elementsCount2
         return self.createPositionProportion(proportion1, proportion2), onBoundary, adxi1, adxi2
 
-    def _getIntersectionDelta(self, position, otherTrackSurface, otherPosition, stickyBoundaryCount):
+    def _getIntersectionDelta(self, position, otherTrackSurface, otherPosition, stickyBoundaryCount,
+                              nearestMaxIterations=None):
         """
         Calculate delta (rTangent) vector directed in surface toward nearest/intersection point.
         Extracted as called multiple times in findIntersectionPoint().
@@ -453,42 +661,54 @@ class TrackSurface:
         :param otherTrackSurface: Other surface to intersect with.
         :param otherPosition: Current/prior nearest position on otherTrackSurface, updated before use.
         :param stickyBoundaryCount: A positive number forces sticking onto boundary of this surface.
+        :param nearestMaxIterations: Optional iteration cap for the nested warm-started
+        findNearestPosition calls; partial results are corrected on later outer iterations.
         :return: coordinate on surface (x, d1, d2), surface normal, increment normal (different if tracking on
         boundary), onBoundary, otherPosition, coordinates of nearest point on other surface (ox, od1, od2),
         onOtherBoundary, projection vector r to other position, projection r normal vector, projection r tangent vector.
         """
         onBoundary = self.positionOnBoundary(position)
         x, d1, d2 = self.evaluateCoordinates(position, derivatives=True)
-        otherPosition = otherTrackSurface.findNearestPosition(x, otherPosition)
+        otherPosition = otherTrackSurface.findNearestPosition(x, otherPosition, maxIterations=nearestMaxIterations)
         onOtherBoundary = otherTrackSurface.positionOnBoundary(otherPosition)
         if onOtherBoundary and ((not onBoundary) or (stickyBoundaryCount <= 0)):
             ox = otherTrackSurface.evaluateCoordinates(otherPosition)
-            position2 = self.findNearestPosition(ox, position)
+            position2 = self.findNearestPosition(ox, position, maxIterations=nearestMaxIterations)
             position.e1 = position2.e1
             position.e2 = position2.e2
             position.xi1 = position2.xi1
             position.xi2 = position2.xi2
             onBoundary = self.positionOnBoundary(position)
             x, d1, d2 = self.evaluateCoordinates(position, derivatives=True)
-            otherPosition = otherTrackSurface.findNearestPosition(x, otherPosition)
+            otherPosition = otherTrackSurface.findNearestPosition(x, otherPosition, maxIterations=nearestMaxIterations)
             onOtherBoundary = otherTrackSurface.positionOnBoundary(otherPosition)
         ox, od1, od2 = otherTrackSurface.evaluateCoordinates(otherPosition, derivatives=True)
-        r = sub(ox, x)
-        n1 = normalize(cross(d1, d2))
+        # inline 3-component vector math: the helpers allocate a list per call
+        # and this delta is evaluated three times per solver iteration
+        rx = ox[0] - x[0]
+        ry = ox[1] - x[1]
+        rz = ox[2] - x[2]
+        r = [rx, ry, rz]
+        cx = d1[1]*d2[2] - d1[2]*d2[1]
+        cy = d1[2]*d2[0] - d1[0]*d2[2]
+        cz = d1[0]*d2[1] - d1[1]*d2[0]
+        mag = math.sqrt(cx*cx + cy*cy + cz*cz)
+        n1 = [cx / mag, cy / mag, cz / mag]
         n = n1
-        r_dot_n = dot(r, n)
+        r_dot_n = rx*n[0] + ry*n[1] + rz*n[2]
         if r_dot_n < 0:
             # flip normal to be towards other x
             n = [-s for s in n]
             r_dot_n = -r_dot_n
-        rNormal = mult(n, r_dot_n)
-        rTangent = sub(r, rNormal)
-        if onBoundary and (magnitude(rTangent) > 0.0):
+        rNormal = [n[0]*r_dot_n, n[1]*r_dot_n, n[2]*r_dot_n]
+        rTangent = [rx - rNormal[0], ry - rNormal[1], rz - rNormal[2]]
+        magTangent2 = (rTangent[0]*rTangent[0] + rTangent[1]*rTangent[1] + rTangent[2]*rTangent[2]) \
+            if onBoundary else 0.0
+        if onBoundary and (magTangent2 > 0.0):
             # stick on boundary unless strongly inward
             xiBoundaryDirection = self._boundaryDirection(position)
             outward = normalize(add(mult(d1, xiBoundaryDirection[0]), mult(d2, xiBoundaryDirection[1])))
-            rTangent_dot_outward = dot(outward, normalize(rTangent))
-            # print("    rTangent_dot_outward", rTangent_dot_outward)
+            rTangent_dot_outward = dot(outward, rTangent) / math.sqrt(magTangent2)
             if (rTangent_dot_outward > -0.01) or (stickyBoundaryCount > 0):  # was -0.95: then -0.5
                 d = d1 if (onBoundary == 2) else d2
                 n = cross(cross(d, r), d)
@@ -515,7 +735,7 @@ class TrackSurface:
         mag_direction = magnitude(direction)
         dxi1 = DELTA_XI * direction[0] / mag_direction
         dxi2 = DELTA_XI * direction[1] / mag_direction
-        tmpPosition = copy.copy(position)
+        tmpPosition = position.clone()
         tmpPosition.offsetXi(-0.5 * dxi1, -0.5 * dxi2)
         xa, d1, d2 = self.evaluateCoordinates(tmpPosition, derivatives=True)
         da = add(mult(d1, dxi1), mult(d2, dxi2))
@@ -546,11 +766,11 @@ class TrackSurface:
         """
         if instrument:
             print("findIntersectionPoint startPosition", startPosition, "otherPosition", otherStartPosition)
-        position = copy.deepcopy(startPosition)
-        otherPosition = copy.deepcopy(otherStartPosition)
+        position = startPosition.clone()
+        otherPosition = otherStartPosition.clone()
         MAX_MAG_DXI = 0.5  # target/maximum magnitude of xi increment
         MINIMUM_DXI = 1.0E-10
-        X_TOL = 1.0E-6 * max(self._xRange)
+        X_TOL = self._xTol
         MAG_JOLT_DXI = 0.05  # magnitude of xi change when jolting out of local minimum
         mag_dxi = 0.0
         jolt_index = 0
@@ -560,24 +780,25 @@ class TrackSurface:
         oldOnBoundary = self.positionOnBoundary(position)
         stickyBoundaryCount = STICKY_BOUNDARY_ITERATIONS if oldOnBoundary else 0
         joltBoundaryCount = 0
-        # XI_TOL = 1.0E-6
-        # lowDxiCount = 0
         for it in range(100):
+            # near convergence the nested nearest-position searches start warm and only
+            # need a few iterations; partial results are corrected on later outer iterations
+            nearestMaxIterations = 3 if (it > 5) else None
             coords, n1, n, onBoundary, otherPosition, otherCoords, onOtherBoundary, r, rNormal, rTangent = \
-                self._getIntersectionDelta(position, otherTrackSurface, otherPosition, stickyBoundaryCount)
+                self._getIntersectionDelta(position, otherTrackSurface, otherPosition, stickyBoundaryCount,
+                                           nearestMaxIterations)
             if onBoundary:
                 if onBoundary != oldOnBoundary:
                     stickyBoundaryCount = STICKY_BOUNDARY_ITERATIONS
             else:
                 stickyBoundaryCount = 0
             oldOnBoundary = onBoundary
-            mag_r = magnitude(r)
+            mag_r = math.sqrt(r[0]*r[0] + r[1]*r[1] + r[2]*r[2])
             if instrument:
                 print("iter", it + 1, "pos", position, onBoundary, "other", otherPosition, onOtherBoundary,
                       "mag_r", mag_r)
             if mag_r < X_TOL:
                 n2 = normalize(cross(otherCoords[1], otherCoords[2]))
-                # print("dot(n1, n2)", dot(n1, n2))
                 if abs(dot(n1, n2)) < 0.9999:
                     tangent = cross(n1, n2)
                 elif (onBoundary == 2) and (dot(normalize(coords[1]), normalize(otherCoords[1])) > 0.9999):
@@ -592,20 +813,18 @@ class TrackSurface:
                     print("TrackSurface.findIntersectionPoint found intersection: "
                           "pos", position, "other", otherPosition, "mag_r", mag_r, "tangent", tangent, "iter", it + 1)
                 return position, otherPosition, coords[0], tangent, onBoundary
-            mag_ri = magnitude(rTangent)
+            mag_ri2 = rTangent[0]*rTangent[0] + rTangent[1]*rTangent[1] + rTangent[2]*rTangent[2]
             slope_factor = MAX_SLOPE_FACTOR
-            if mag_ri == 0.0:
+            if mag_ri2 == 0.0:
                 u = [0.0, 0.0, 0.0]
             else:
-                slope_factor = mag_r * mag_r / (mag_ri * mag_ri)
+                slope_factor = mag_r * mag_r / mag_ri2
                 if instrument:
                     print("    slope_factor", slope_factor, "rTangent", rTangent)
                 if slope_factor > MAX_SLOPE_FACTOR:
                     slope_factor = MAX_SLOPE_FACTOR
-                u = mult(rTangent, slope_factor)
+                u = [s * slope_factor for s in rTangent]
             dxi1, dxi2 = calculate_surface_delta_xi(coords[1], coords[2], u)
-            # dxi = [dxi1, dxi2]
-            # mag_dxi = magnitude(dxi)
             if instrument:
                 print("    initial dxi", dxi1, dxi2, jolt_it, stickyBoundaryCount)
             if (it > (jolt_it + 1)) and (slope_factor >= MAX_SLOPE_FACTOR) \
@@ -645,14 +864,16 @@ class TrackSurface:
             r1 = mag_r
             positionPlus, crossBoundary, dxi1, dxi2 = self._advancePosition(
                 position, dxi1, dxi2, MAX_MAG_DXI=MAX_MAG_DXI)
-            rPlus = self._getIntersectionDelta(positionPlus, otherTrackSurface, otherPosition, stickyBoundaryCount)[7]
-            r3 = magnitude(rPlus)
-            if dot(rPlus, n) < 0.0:
+            rPlus = self._getIntersectionDelta(positionPlus, otherTrackSurface, otherPosition, stickyBoundaryCount,
+                                               nearestMaxIterations)[7]
+            r3 = math.sqrt(rPlus[0]*rPlus[0] + rPlus[1]*rPlus[1] + rPlus[2]*rPlus[2])
+            if (rPlus[0]*n[0] + rPlus[1]*n[1] + rPlus[2]*n[2]) < 0.0:
                 r3 = -r3
             positionHalf = self._advancePosition(position, 0.5 * dxi1, 0.5 * dxi2, MAX_MAG_DXI=MAX_MAG_DXI)[0]
-            rHalf = self._getIntersectionDelta(positionHalf, otherTrackSurface, otherPosition, stickyBoundaryCount)[7]
-            r2 = magnitude(rHalf)
-            if dot(rHalf, n) < 0.0:
+            rHalf = self._getIntersectionDelta(positionHalf, otherTrackSurface, otherPosition, stickyBoundaryCount,
+                                               nearestMaxIterations)[7]
+            r2 = math.sqrt(rHalf[0]*rHalf[0] + rHalf[1]*rHalf[1] + rHalf[2]*rHalf[2])
+            if (rHalf[0]*n[0] + rHalf[1]*n[1] + rHalf[2]*n[2]) < 0.0:
                 r2 = -r2
             # quadratic equation
             a = 2.0 * r1 - 4.0 * r2 + 2.0 * r3
@@ -689,8 +910,6 @@ class TrackSurface:
                     abs_r2 = abs(r2)
                     abs_r3 = abs(r3)
                     xiFactor = 1.0 if ((abs_r3 < abs_r1) and (abs_r3 < abs_r2)) else 0.5 if (abs_r2 < abs_r1) else 0.0
-                    # xiFactor = 1.0 if ((abs_r3 < abs_r1) and (abs_r3 < abs_r2)) else 0.5 if (abs_r2 < abs_r1) else \
-                    #     0.1 if (it == jolt_it) else 0.0
             dxi1 = dxi1 * xiFactor
             dxi2 = dxi2 * xiFactor
             if instrument:
@@ -698,19 +917,16 @@ class TrackSurface:
             position, onBoundary, dxi1, dxi2 = self._advancePosition(position, dxi1, dxi2, MAX_MAG_DXI=MAX_MAG_DXI)
             if instrument:
                 print("    final dxi", dxi1, dxi2)
-            dxi = [dxi1, dxi2]
-            mag_dxi = magnitude(dxi)
+            mag_dxi = math.sqrt(dxi1*dxi1 + dxi2*dxi2)
             if (it >= 50) and (mag_dxi < MINIMUM_DXI):
                 if instrument:
-                    print("TrackSurface.findIntersectionPoint low increment after", it + 1, "iterations, dxi", dxi)
+                    print("TrackSurface.findIntersectionPoint low increment after", it + 1,
+                          "iterations, dxi", [dxi1, dxi2])
                 break
             stickyBoundaryCount -= 1
         else:
             print('TrackSurface.findIntersectionPoint failed:  Reached max iterations', it + 1,
                   'last increment', mag_dxi)
-            # if not instrument:
-            #     return self.findIntersectionPoint(
-            #         otherTrackSurface, startPosition, otherStartPosition, instrument=True)
         return None, None, None, None, 0
 
     def findIntersectionCurve(self, otherTrackSurface, startPosition: TrackSurfacePosition = None,
@@ -735,27 +951,23 @@ class TrackSurface:
             startX = self.evaluateCoordinates(startPosition, derivatives=False)
             otherPosition = otherStartPosition = self.findNearestPositionSample(startX)[0]
         else:
-            nearestDistance = None
-            startPosition = None
-            otherStartPosition = None
-            for n2 in range(self._elementsCount2):
-                for n1 in range(self._elementsCount1):
-                    position = TrackSurfacePosition(n1, n2, 0.5, 0.5)
-                    targetx = self.evaluateCoordinates(position)
-                    otherPosition, distance = otherTrackSurface.findNearestPositionSample(targetx)
-                    if (nearestDistance is None) or (distance < nearestDistance):
-                        nearestDistance = distance
-                        startPosition = position
-                        otherStartPosition = otherPosition
+            # single pairwise scan over both surfaces' element centres
+            selfCentres = self._getCentreArray()
+            otherCentres = otherTrackSurface._getCentreArray()
+            dist2 = ((selfCentres[:, None, :] - otherCentres[None, :, :]) ** 2).sum(axis=2)
+            p, op = divmod(int(dist2.argmin()), otherCentres.shape[0])
+            e2, e1 = divmod(p, self._elementsCount1)
+            oe2, oe1 = divmod(op, otherTrackSurface._elementsCount1)
+            startPosition = TrackSurfacePosition(e1, e2, 0.5, 0.5)
+            otherStartPosition = TrackSurfacePosition(oe1, oe2, 0.5, 0.5)
             nextPosition = startPosition
             otherPosition = otherStartPosition
         START_MAX_MAG_DXI = MAX_MAG_DXI
-        X_TOL = 1.0E-6 * max(self._xRange)
+        X_TOL = self._xTol
         px = []
         pd1 = []
         boundaryCount = 0
         loop = False
-        xiLoopSamples = [0.25, 0.5, 0.75, 1.0]
         pointCount = 0
         crossBoundary = 0
         lastx = None
@@ -831,14 +1043,19 @@ class TrackSurface:
             if (boundaryCount == 0) and (pointCount > 2):
                 x1, d1 = px[-2], pd1[-2]
                 x2, d2 = px[-1], pd1[-1]
-                dscale = computeCubicHermiteArcLength(x1, d1, x2, d2, rescaleDerivatives=True)
+                # chord length is close enough to arc length for the loose
+                # 20% threshold below, and avoids iterative arc length integration
+                dscale = math.sqrt((x2[0] - x1[0])*(x2[0] - x1[0]) + (x2[1] - x1[1])*(x2[1] - x1[1]) +
+                                   (x2[2] - x1[2])*(x2[2] - x1[2]))
                 d1 = mult(d1, dscale)
                 d2 = mult(d2, dscale)
-                for xi in xiLoopSamples:
-                    tx = interpolateCubicHermite(x1, d1, x2, d2, xi)
-                    delta = sub(tx, px[0])
-                    distance = magnitude(delta)
-                    if distance < (0.2 * dscale):
+                x0 = px[0]
+                loopTol2 = (0.2 * dscale) * (0.2 * dscale)
+                for f1, f2, f3, f4 in _xiLoopSampleBasis:
+                    deltax = f1*x1[0] + f2*d1[0] + f3*x2[0] + f4*d2[0] - x0[0]
+                    deltay = f1*x1[1] + f2*d1[1] + f3*x2[1] + f4*d2[1] - x0[1]
+                    deltaz = f1*x1[2] + f2*d1[2] + f3*x2[2] + f4*d2[2] - x0[2]
+                    if (deltax*deltax + deltay*deltay + deltaz*deltaz) < loopTol2:
                         loop = True
                         break
                 if loop:
@@ -872,20 +1089,20 @@ class TrackSurface:
         cProportions = []
         otherPosition = otherTrackSurface.findNearestPositionSample(nx[0])[0]
         assert otherPosition is not None
+        # hoist method lookups out of the resample-find loop
+        findNearestPosition = self.findNearestPosition
+        findIntersectionPoint = self.findIntersectionPoint
+        getProportion = self.getProportion
         for n in range(len(nx)):
-            position = self.findNearestPosition(nx[n], position)
+            position = findNearestPosition(nx[n], position)
             assert position is not None
-            # tmpPosition = position
-            # tmpOtherPosition = otherPosition
             position, otherPosition, x, t, onBoundary =\
-                self.findIntersectionPoint(otherTrackSurface, position, otherPosition)
+                findIntersectionPoint(otherTrackSurface, position, otherPosition)
             if position is None:
                 print("\nDid not re-find position!\n")
-                # position, otherPosition, x, t, onBoundary = \
-                #     self.findIntersectionPoint(otherTrackSurface, tmpPosition, tmpOtherPosition, instrument=True)
             cx.append(x)
             cd1.append(t)
-            proportion = self.getProportion(position)
+            proportion = getProportion(position)
             if self._loop1 and (n > 0) and (abs(proportion[0] - cProportions[-1][0]) > 1.0):
                 # wrapped around 0.0 or 2.0: displace proportions to be within (0, 2)
                 if proportion[0] < 1.0:
@@ -929,27 +1146,14 @@ class TrackSurface:
         :param targetx: Coordinates of point to find nearest to.
         :return: nearest TrackSurfacePosition, nearest distance
         """
-        if self._loop1:
-            # future: loop option to limit to between [0.5, 1.5]
-            # n1Start = self._elementsCount1 // 2
-            # n1Limit = n1Start + self._elementsCount1
-            n1Start = 0
-            n1Limit = self._elementsCount1
-        else:
-            n1Start = 0
-            n1Limit = self._elementsCount1 + 1
-        p = 0
-        nearest_distance = None
-        nearest_n1 = None
-        nearest_n2 = None
-        for n2 in range(self._elementsCount2 + 1):
-            for n1 in range(n1Start, n1Limit):
-                distance = magnitude(sub(self._nx[p], targetx))
-                if (nearest_distance is None) or (distance < nearest_distance):
-                    nearest_distance = distance
-                    nearest_n1 = n1
-                    nearest_n2 = n2
-                p += 1
+        # future: loop option to limit to between [0.5, 1.5]
+        # one node per element around direction 1 if loop1, so rows match storage
+        nodesCount1 = self._elementsCount1 if self._loop1 else self._elementsCount1 + 1
+        diff = self._getCoordinatesArray() - targetx
+        dist2 = np.einsum('ij,ij->i', diff, diff)
+        p = int(dist2.argmin())
+        nearest_n2, nearest_n1 = divmod(p, nodesCount1)
+        nearest_distance = math.sqrt(dist2[p])
         return self.createPositionProportion(nearest_n1 / self._elementsCount1, nearest_n2 / self._elementsCount2), \
             nearest_distance
 
@@ -960,56 +1164,55 @@ class TrackSurface:
         :param targetx: Coordinates of point to find nearest to.
         :return: nearest TrackSurfacePosition, nearest distance
         """
-        e1Start = 0
         # future: loop option to limit to between [0.5, 1.5]
-        # e1Start = (self._elementsCount1 // 2) if self._loop1 else 0
-        e1Limit = e1Start + self._elementsCount1
-        nearestDistance = None
-        nearestPosition = None
-        for e2 in range(self._elementsCount2):
-            for e1 in range(e1Start, e1Limit):
-                position = TrackSurfacePosition(e1, e2, 0.5, 0.5)
-                x = self.evaluateCoordinates(position)
-                distance = magnitude(sub(x, targetx))
-                if (nearestDistance is None) or (distance < nearestDistance):
-                    nearestDistance = distance
-                    nearestPosition = position
-        return nearestPosition, nearestDistance
-
-    def findNearestPosition(self, targetx: list, startPosition: TrackSurfacePosition = None, instrument=False) \
-            -> TrackSurfacePosition:
+        diff = self._getCentreArray() - targetx
+        dist2 = np.einsum('ij,ij->i', diff, diff)
+        p = int(dist2.argmin())
+        e2, e1 = divmod(p, self._elementsCount1)
+        return TrackSurfacePosition(e1, e2, 0.5, 0.5), math.sqrt(dist2[p])
+
+    def findNearestPosition(self, targetx: list, startPosition: TrackSurfacePosition = None, instrument=False,
+                            maxIterations: int = None) -> TrackSurfacePosition:
         """
         Find the nearest point to targetx on the track surface, with optional start position.
         Only works if track surface is simply shaped; use a close startPosition if not.
         :param targetx:  Coordinates of point to find nearest to.
         :param startPosition: Optional initial track surface position.
         :param instrument: Set to True to print debug messages.
+        :param maxIterations: Optional cap on iterations for warm-started calls where a
+        partial result is acceptable; suppresses the non-convergence warning when hit.
         :return: Nearest TrackSurfacePosition
         """
         if instrument:
             print("> findNearestPosition target", targetx, "startPosition", startPosition)
         if not startPosition:
             startPosition = self.createPositionProportion(0.5, 0.5)
-        position = copy.deepcopy(startPosition)
+        position = startPosition.clone()
         MAX_MAG_DXI = 0.5  # target/maximum magnitude of xi increment
         XI_TOL = 1.0E-7
-        MIN_CURVATURE = 0.1 / max(self._xRange)  # minimum to consider
+        STALL_XI_TOL = 1.0E-6  # step size below which a stalled step counts as converged
+        MIN_CURVATURE = 0.1 / self._maxXRange  # minimum to consider
         MAX_CURVATURE_FACTOR = 100.0
         r_mag = 0.0
         mag_adxi = 0
+        last_mag_adxi = None
+        lastState = prevState = None
         MAX_ITERS = 100
-        for it in range(MAX_ITERS):
-            x, d1, d2 = self.evaluateCoordinates(position, derivatives=True)
-            onBoundary = self.positionOnBoundary(position)
+        # hoist method lookups out of the Newton loop
+        evaluateCoordinates = self.evaluateCoordinates
+        positionOnBoundary = self.positionOnBoundary
+        advancePosition = self._advancePosition
+        for it in range(maxIterations if maxIterations else MAX_ITERS):
+            x, d1, d2 = evaluateCoordinates(position, derivatives=True)
+            onBoundary = positionOnBoundary(position)
             r = sub(targetx, x)
             r_mag = magnitude(r)
             if instrument:
                 print('> iter', it + 1, 'position', position, 'bdy', onBoundary, 'r', r, 'dist', r_mag)
             # get linear increment
             dxi1, dxi2 = calculate_surface_delta_xi(d1, d2, r)
-            dxi = [dxi1, dxi2]
             if instrument:
-                print("    initial dxi", dxi)
+                print("    initial dxi", [dxi1, dxi2])
             if onBoundary:
                 # is increment outward from boundary?
                 xiBoundaryDirection = self._boundaryDirection(position)
@@ -1025,15 +1228,14 @@ class TrackSurface:
                         mag_d = magnitude(d1)
                         dxi1 = dot(d1, r) / (mag_d * mag_d)
                         dxi2 = 0.0
-                    dxi = [dxi1, dxi2]
                     if instrument:
-                        print("    track boundary", onBoundary, "dxi", dxi)
-            mag_dxi = magnitude(dxi)
+                        print("    track boundary", onBoundary, "dxi", [dxi1, dxi2])
+            mag_dxi = math.sqrt(dxi1*dxi1 + dxi2*dxi2)
             if mag_dxi == 0.0:
                 if instrument:
                     print("TrackSurface.findNearestPosition:  converged in", it + 1, "iterations, mag_dxi", mag_dxi)
                 break
-            curvature, tangent, dTangent = self._getDirectionalCurvature(position, dxi)
+            curvature, tangent, dTangent = self._getDirectionalCurvature(position, [dxi1, dxi2])
             if curvature > MIN_CURVATURE:
                 # get non-linear increment using radius of curvature
                 radius = 1.0 / curvature
@@ -1054,27 +1256,37 @@ class TrackSurface:
                          curvatureFactor = MAX_CURVATURE_FACTOR
                 dxi1 *= curvatureFactor
                 dxi2 *= curvatureFactor
-                dxi = [dxi1, dxi2]
                 if instrument:
                     print("    curvature", curvature, "curvature factor", curvatureFactor, "angle",
                           math.degrees(angle), "degrees")
                     print("    centre", centre, "delta", delta)
                     print("    iVector", iVector, "di", di)
                     print("    jVector", jVector, "dj", dj)
-                    print("    curved dxi", dxi)
-            position, onBoundary, adxi1, adxi2 = self._advancePosition(position, dxi1, dxi2, MAX_MAG_DXI=MAX_MAG_DXI)
-            adxi = [adxi1, adxi2]
-            mag_adxi = magnitude(adxi)
+                    print("    curved dxi", [dxi1, dxi2])
+            position, onBoundary, adxi1, adxi2 = advancePosition(position, dxi1, dxi2, MAX_MAG_DXI=MAX_MAG_DXI)
+            mag_adxi = math.sqrt(adxi1*adxi1 + adxi2*adxi2)
             if instrument:
-                print("    final dxi", adxi)
+                print("    final dxi", [adxi1, adxi2])
             if mag_adxi < XI_TOL:
                 if instrument:
                     print("TrackSurface.findNearestPosition:  converged in", it + 1, "iterations, dxi", mag_adxi)
                 break
+            # stall detection: stop early if oscillating between the same two positions,
+            # or if the step size is already tiny and no longer changing
+            state = (position.e1, position.e2, position.xi1, position.xi2)
+            if (state == prevState) or \
+                    ((mag_adxi < STALL_XI_TOL) and (last_mag_adxi is not None) and
+                     (math.fabs(mag_adxi - last_mag_adxi) < (0.01 * mag_adxi))):
+                if instrument:
+                    print("TrackSurface.findNearestPosition:  stalled in", it + 1, "iterations, dxi", mag_adxi)
+                break
+            prevState = lastState
+            lastState = state
+            last_mag_adxi = mag_adxi
         else:
-            print('TrackSurface.findNearestPosition:  Reached max iterations', it + 1, 'dxi', mag_adxi, 'dist', r_mag)
-            # if not instrument:
-            #     self.findNearestPosition(targetx, startPosition, instrument=True)
+            if not maxIterations:
+                print('TrackSurface.findNearestPosition:  Reached max iterations', it + 1,
+                      'dxi', mag_adxi, 'dist', r_mag)
         if instrument:
             print("    final position", position)
         return position
@@ -1101,13 +1313,12 @@ class TrackSurface:
         nCount = len(cx)
         assert nCount > 1
         eCount = nCount if loop else nCount - 1
-        curveLocation = copy.copy(startCurveLocation) if startCurveLocation else None
+        curveLocation = tuple(startCurveLocation) if startCurveLocation else None
         surfacePosition = None
         if curveLocation:
             targetx = evaluateCoordinatesOnCurve(cx, cd1, curveLocation, loop)
             surfacePosition = self.findNearestPositionSample(targetx)[0]
         else:
-            nearestDistance = None
             sCount = eCount * curveSamples
             sStart = 0 if (loop or sampleEnds) else 1
             sLimit = sCount if (loop or not sampleEnds) else sCount + 1
@@ -1115,19 +1326,26 @@ class TrackSurface:
                 sLimit = (sCount + 1) // 2  # first half
             elif sampleHalf == 2:
                 sStart = (sCount - 1) // 2  # last half
+            # evaluate all candidate curve locations then scan against all element
+            # centres in one pairwise distance pass
+            curveLocations = []
+            xiScale = 1.0 / curveSamples
             for s in range(sStart, sLimit):
-                tmpCurveLocation = (s // curveSamples, (s % curveSamples) / curveSamples)
+                tmpCurveLocation = (s // curveSamples, (s % curveSamples) * xiScale)
                 if not loop and (s == sCount):
                     tmpCurveLocation = (tmpCurveLocation[0] - 1, 1.0)
-                targetx = evaluateCoordinatesOnCurve(cx, cd1, tmpCurveLocation, loop)
-                tmpSurfacePosition, tmpDistance = self.findNearestPositionSample(targetx)
-                if (nearestDistance is None) or (tmpDistance < nearestDistance):
-                    nearestDistance = tmpDistance
-                    curveLocation = tmpCurveLocation
-                    surfacePosition = tmpSurfacePosition
+                curveLocations.append(tmpCurveLocation)
+            samplex = np.array([evaluateCoordinatesOnCurve(cx, cd1, tmpCurveLocation, loop)
+                                for tmpCurveLocation in curveLocations])
+            centrex = self._getCentreArray()
+            dist2 = ((samplex[:, None, :] - centrex[None, :, :]) ** 2).sum(axis=2)
+            s, p = divmod(int(dist2.argmin()), centrex.shape[0])
+            e2, e1 = divmod(p, self._elementsCount1)
+            curveLocation = curveLocations[s]
+            surfacePosition = TrackSurfacePosition(e1, e2, 0.5, 0.5)
         MAX_MAG_DXI = 0.5  # target/maximum magnitude of xi increment
         XI_TOL = 1.0E-7
-        X_TOL = 1.0E-6 * max(self._xRange)
+        X_TOL = self._xTol
         MAX_SLOPE_FACTOR = 10000.0
         lastOnBoundary = False
         last_dxi = None
@@ -1136,24 +1354,29 @@ class TrackSurface:
             surfacePosition = self.findNearestPosition(x, surfacePosition, instrument=instrument)
             onOtherBoundary = self.positionOnBoundary(surfacePosition)
             other_x = self.evaluateCoordinates(surfacePosition)
-            r = sub(other_x, x)
-            mag_r = magnitude(r)
+            r = [other_x[0] - x[0], other_x[1] - x[1], other_x[2] - x[2]]
+            mag_r = math.sqrt(r[0]*r[0] + r[1]*r[1] + r[2]*r[2])
             if instrument:
                 print("iter", it, "curve location", curveLocation, "surface position", surfacePosition, "mag_r", mag_r)
             if mag_r < X_TOL:
                 if instrument:
                     print("TrackSurface.findNearestPositionOnCurve:  Found intersection: ", curveLocation, "on iter", it + 1)
                 return surfacePosition, curveLocation, True
-            n = normalize(cross(cross(d, r), d))
-            r_dot_n = dot(r, n)
+            # cross(cross(d, r), d) expanded by the triple product rule: r(d.d) - d(d.r)
+            d_dot_d = d[0]*d[0] + d[1]*d[1] + d[2]*d[2]
+            d_dot_r = d[0]*r[0] + d[1]*r[1] + d[2]*r[2]
+            n = [r[0]*d_dot_d - d[0]*d_dot_r, r[1]*d_dot_d - d[1]*d_dot_r, r[2]*d_dot_d - d[2]*d_dot_r]
+            mag_n = math.sqrt(n[0]*n[0] + n[1]*n[1] + n[2]*n[2])
+            n = [n[0]/mag_n, n[1]/mag_n, n[2]/mag_n]
+            r_dot_n = r[0]*n[0] + r[1]*n[1] + r[2]*n[2]
             if r_dot_n < 0:
                 # flip normal to be towards other x
                 n = [-s for s in n]
                 r_dot_n = -r_dot_n
-            rNormal = mult(n, r_dot_n)
-            rTangent = sub(r, rNormal)
-            mag_ri = magnitude(rTangent)
-            mag_ro = magnitude(rNormal)
+            rNormal = [n[0]*r_dot_n, n[1]*r_dot_n, n[2]*r_dot_n]
+            rTangent = [r[0] - rNormal[0], r[1] - rNormal[1], r[2] - rNormal[2]]
+            mag_ri = math.sqrt(rTangent[0]*rTangent[0] + rTangent[1]*rTangent[1] + rTangent[2]*rTangent[2])
+            mag_ro = math.sqrt(rNormal[0]*rNormal[0] + rNormal[1]*rNormal[1] + rNormal[2]*rNormal[2])
             # get tangential displacement u
             if onOtherBoundary:
                 u = rTangent
@@ -1167,19 +1390,19 @@ class TrackSurface:
                     print("    slope_factor", slope_factor, "rTangent", rTangent)
                 if slope_factor > MAX_SLOPE_FACTOR:
                     slope_factor = MAX_SLOPE_FACTOR
-                u = mult(rTangent, slope_factor)
+                u = [rTangent[0]*slope_factor, rTangent[1]*slope_factor, rTangent[2]*slope_factor]
             # limit by curvature and distance to other_x
             nm = curveLocation[0]
-            np = (nm + 1) % nCount
-            curveCurvature = getCubicHermiteCurvatureSimple(cx[nm], cd1[nm], cx[np], cd1[np], curveLocation[1])[0]
+            nn = (nm + 1) % nCount
+            curveCurvature = getCubicHermiteCurvatureSimple(cx[nm], cd1[nm], cx[nn], cd1[nn], curveLocation[1])[0]
             surfaceCurvature1 = self._getDirectionalCurvature(surfacePosition, direction=[1.0, 0.0])[0]
             surfaceCurvature2 = self._getDirectionalCurvature(surfacePosition, direction=[0.0, 1.0])[0]
             curvature = curveCurvature + surfaceCurvature1 + surfaceCurvature2
-            uNormal = sub(r, u)
-            un = magnitude(uNormal)
+            uNormal = [r[0] - u[0], r[1] - u[1], r[2] - u[2]]
+            un = math.sqrt(uNormal[0]*uNormal[0] + uNormal[1]*uNormal[1] + uNormal[2]*uNormal[2])
             # GRC check:
             curvatureFactor = 1.0 / (un * curvature + 1.0)
-            mag_u = magnitude(u) * curvatureFactor
+            mag_u = math.sqrt(u[0]*u[0] + u[1]*u[1] + u[2]*u[2]) * curvatureFactor
             # never go further than parallel, based on curvature from initial angle
             parallelFactor = 1.0
             if curvature > 0.0:
@@ -1190,11 +1413,11 @@ class TrackSurface:
             if instrument:
                 print("--> curvature", curvature, "curvature factor", curvatureFactor, "parallel factor",
                       parallelFactor)
-            mag_dxi = mag_u / magnitude(d)
+            mag_dxi = mag_u / math.sqrt(d_dot_d)
             if mag_dxi > MAX_MAG_DXI:
                 mag_dxi = MAX_MAG_DXI
             dxi = mag_dxi
-            if dot(u, d) < 0.0:
+            if (u[0]*d[0] + u[1]*d[1] + u[2]*d[2]) < 0.0:
                 dxi = -dxi
             if instrument:
                 print("    dxi", dxi)
@@ -1243,14 +1466,12 @@ class TrackSurface:
         :param trackDistance: Distance to track along. Can be negative.
         :return: Final TrackSurfacePosition
         """
-        # print("TrackSurface.trackVector  start position", startPosition, "direction", direction,
-        #       "distance", trackDistance)
         useDirection = direction
         useTrackDistance = trackDistance
         if trackDistance < 0.0:
             useDirection = [-d for d in direction]
             useTrackDistance = -trackDistance
-        position = copy.deepcopy(startPosition)
+        position = startPosition.clone()
         distance = 0.0
         distanceLimit = 0.9999*useTrackDistance
         MAX_MAG_DXI = 0.02  # target/maximum magnitude of xi increment
@@ -1406,35 +1627,39 @@ class TrackSurface:
             fieldcache = fieldmodule.createFieldcache()
 
             nodeset_group = group.getOrCreateNodesetGroup(nodes) if group else None
+            # hoist bound methods and label constants out of the per-node loop:
+            # Zinc binding dispatch dominates its cost
+            createNode = nodes.createNode
+            setNode = fieldcache.setNode
+            setNodeParameters = coordinates.setNodeParameters
+            valueLabel = Node.VALUE_LABEL_VALUE
+            d1Label = Node.VALUE_LABEL_D_DS1
+            d2Label = Node.VALUE_LABEL_D_DS2
+            d12Label = Node.VALUE_LABEL_D2_DS1DS2
+            nd12 = self._nd12
             for n1 in range(len(self._nx)):
-                node = nodes.createNode(nodeIdentifier, nodetemplate)
-                fieldcache.setNode(node)
-                coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_VALUE, 1, self._nx[n1])
-                coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS1, 1, self._nd1[n1])
-                coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D_DS2, 1, self._nd2[n1])
-                if self._nd12:
-                    coordinates.setNodeParameters(fieldcache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, self._nd12[n1])
+                node = createNode(nodeIdentifier, nodetemplate)
+                setNode(node)
+                setNodeParameters(fieldcache, -1, valueLabel, 1, self._nx[n1])
+                setNodeParameters(fieldcache, -1, d1Label, 1, self._nd1[n1])
+                setNodeParameters(fieldcache, -1, d2Label, 1, self._nd2[n1])
+                if nd12:
+                    setNodeParameters(fieldcache, -1, d12Label, 1, nd12[n1])
                 if nodeset_group:
                     nodeset_group.addNode(node)
                 nodeIdentifier += 1
             del n1
 
             mesh_group = group.getOrCreateMeshGroup(mesh) if group else None
-            nodesCount1 = self._elementsCount1 if self._loop1 else self._elementsCount1 + 1
-            for e2 in range(self._elementsCount2):
-                for e1 in range(self._elementsCount1):
-                    nid0 = firstNodeIdentifier + e2 * nodesCount1
-                    n1 = nid0 + e1
-                    n2 = nid0 if (self._loop1 and ((e1 + 1) == self._elementsCount1)) else n1 + 1
-                    n3 = n1 + nodesCount1
-                    n4 = n2 + nodesCount1
-                    nids = [n1, n2, n3, n4]
-                    element = mesh.createElement(elementIdentifier, elementtemplate)
-                    element.setNodesByIdentifier(eft, nids)
-                    # print(elementIdentifier, element.isValid(), nids)
-                    if mesh_group:
-                        mesh_group.addElement(element)
-                    elementIdentifier += 1
+            createElement = mesh.createElement
+            # element local node identifiers come straight from the corner index table
+            for elementNodeIndexes in self._elementNodeIndexes:
+                nids = [firstNodeIdentifier + nodeIndex for nodeIndex in elementNodeIndexes]
+                element = createElement(elementIdentifier, elementtemplate)
+                element.setNodesByIdentifier(eft, nids)
+                if mesh_group:
+                    mesh_group.addElement(element)
+                elementIdentifier += 1
 
             if group:
                 # ensure all lines are in group
@@ -1453,35 +1678,32 @@ def calculate_surface_delta_xi(d1, d2, direction):
     :return: delta_xi1, delta_xi2
     """
     # overdetermined system (3-D vector, 2-D surface), solve least squares
-    # A transpose A x = A transpose b
-    a = [[0.0, 0.0], [0.0, 0.0]]
-    b = [0.0, 0.0]
-    dx_dxi = [d1, d2]
-    for i in range(2):
-        for j in range(2):
-            for k in range(3):
-                a[i][j] += dx_dxi[i][k] * dx_dxi[j][k]
-        for k in range(3):
-            b[i] += dx_dxi[i][k] * direction[k]
+    # A transpose A x = A transpose b, as straight-line scalar code:
+    # the normal matrix is symmetric so only 3 unique entries are needed
+    a00 = d1[0]*d1[0] + d1[1]*d1[1] + d1[2]*d1[2]
+    a01 = d1[0]*d2[0] + d1[1]*d2[1] + d1[2]*d2[2]
+    a11 = d2[0]*d2[0] + d2[1]*d2[1] + d2[2]*d2[2]
+    b0 = d1[0]*direction[0] + d1[1]*direction[1] + d1[2]*direction[2]
+    b1 = d2[0]*direction[0] + d2[1]*direction[1] + d2[2]*direction[2]
     # 2x2 matrix inverse
-    deta = a[0][0]*a[1][1] - a[0][1]*a[1][0]
+    deta = a00*a11 - a01*a01
     if deta > 0.0:
-        inva = [[a[1][1] / deta, -a[0][1] / deta], [-a[1][0] / deta, a[0][0] / deta]]
-        delta_xi1 = inva[0][0]*b[0] + inva[0][1]*b[1]
-        delta_xi2 = inva[1][0]*b[0] + inva[1][1]*b[1]
+        inva00 = a11 / deta
+        inva01 = -a01 / deta
+        inva11 = a00 / deta
+        delta_xi1 = inva00*b0 + inva01*b1
+        delta_xi2 = inva01*b0 + inva11*b1
     else:
         # at pole: assume direction is inline with d1 or d2 and other is zero
-        delta_xi2 = vector.dotproduct(d2, direction)
+        delta_xi2 = b1
         if math.fabs(delta_xi2) > 0.0:
             delta_xi1 = 0.0
-            delta_xi2 = (1.0 if (delta_xi2 > 0.0) else -1.0)*vector.magnitude(direction)/vector.magnitude(d2)
+            delta_xi2 = (1.0 if (delta_xi2 > 0.0) else -1.0)*vector.magnitude(direction)/math.sqrt(a11)
         else:
-            delta_xi1 = vector.dotproduct(d1, direction)
+            delta_xi1 = b0
             if math.fabs(delta_xi1) > 0.0:
-                delta_xi1 = (1.0 if (delta_xi1 > 0.0) else -1.0)*vector.magnitude(direction)/vector.magnitude(d1)
+                delta_xi1 = (1.0 if (delta_xi1 > 0.0) else -1.0)*vector.magnitude(direction)/math.sqrt(a00)
                 delta_xi2 = 0.0
-    # delx = [ (delta_xi1*d1[c] + delta_xi2*d2[c]) for c in range(3) ]
-    # print('delx', delx, 'dir', direction, 'diff', vector.magnitude([ (delx[c] - direction[c]) for c in range(3) ]))
     return delta_xi1, delta_xi2
 
 
@@ -1515,40 +1737,35 @@ def increment_xi_on_square(xi1, xi2, dxi1, dxi2):
     the face number is returned as an integer:
     1 is xi1==0.0, 2 is xi1==1.0, 3 is xi2==0.0, 4 is xi2==1.0
     """
-    onxi1 = nxi1 = xi1 + dxi1
-    onxi2 = nxi2 = xi2 + dxi2
+    nxi1 = xi1 + dxi1
+    nxi2 = xi2 + dxi2
     proportion = 1.0
     faceNumber = None
     if (nxi1 < 0.0) or (nxi1 > 1.0) or (nxi2 < 0.0) or (nxi2 > 1.0):
-        # come back in direction of dxi1, dxi2 to first boundary
-        if (onxi1 < 0.0) and (dxi1 < 0.0):
-            thisProportion = -xi1/dxi1
-            if thisProportion < proportion:
-                proportion = thisProportion
+        # come back in direction of dxi1, dxi2 to first boundary:
+        # compute all candidate proportions up-front then take the lowest,
+        # with earlier faces winning ties to match the old branch order
+        p1 = -xi1/dxi1 if ((nxi1 < 0.0) and (dxi1 < 0.0)) else math.inf
+        p2 = (1.0 - xi1)/dxi1 if ((nxi1 > 1.0) and (dxi1 > 0.0)) else math.inf
+        p3 = -xi2/dxi2 if ((nxi2 < 0.0) and (dxi2 < 0.0)) else math.inf
+        p4 = (1.0 - xi2)/dxi2 if ((nxi2 > 1.0) and (dxi2 > 0.0)) else math.inf
+        lowestProportion = min(p1, p2, p3, p4)
+        if lowestProportion < proportion:
+            proportion = lowestProportion
+            if p1 == proportion:
                 faceNumber = 1
                 nxi1 = 0.0
                 nxi2 = xi2 + proportion*dxi2
-        elif (onxi1 > 1.0) and (dxi1 > 0.0):
-            thisProportion = (1.0 - xi1)/dxi1
-            if thisProportion < proportion:
-                proportion = thisProportion
+            elif p2 == proportion:
                 faceNumber = 2
                 nxi1 = 1.0
                 nxi2 = xi2 + proportion*dxi2
-        if (onxi2 < 0.0) and (dxi2 < 0.0):
-            thisProportion = -xi2/dxi2
-            if thisProportion < proportion:
-                proportion = thisProportion
+            elif p3 == proportion:
                 faceNumber = 3
                 nxi1 = xi1 + proportion*dxi1
                 nxi2 = 0.0
-        elif (onxi2 > 1.0) and (dxi2 > 0.0):
-            thisProportion = (1.0 - xi2)/dxi2
-            if thisProportion < proportion:
-                proportion = thisProportion
+            else:
                 faceNumber = 4
                 nxi1 = xi1 + proportion*dxi1
                 nxi2 = 1.0
-        # print('  increment to face', faceNumber, 'xi (' + str(xi1) + ',' + str(xi2) + ')', 'nxi (' + str(nxi1)
-        #       + ',' + str(nxi2) + ')')
     return nxi1, nxi2, proportion, faceNumber
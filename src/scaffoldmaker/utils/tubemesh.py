@@ -6,18 +6,18 @@ from __future__ import division
 
 import math
 
+import numpy as np
+
 from cmlibs.utils.zinc.field import findOrCreateFieldCoordinates
 from cmlibs.zinc.element import Element
 from cmlibs.zinc.field import Field
 from cmlibs.zinc.node import Node
-from scaffoldmaker.annotation.annotationgroup import mergeAnnotationGroups
 from scaffoldmaker.utils import interpolation as interp
 from scaffoldmaker.utils import matrix
 from scaffoldmaker.utils import vector
 from scaffoldmaker.utils.eftfactory_bicubichermitelinear import eftfactory_bicubichermitelinear
 from scaffoldmaker.utils.eftfactory_tricubichermite import eftfactory_tricubichermite
 from scaffoldmaker.utils.eft_utils import remapEftNodeValueLabelsVersion
-from scaffoldmaker.utils.geometry import createCirclePoints
 
 
 def getPlaneProjectionOnCentralPath(x, elementsCountAround, elementsCountAlong,
@@ -111,9 +111,10 @@ def warpSegmentPoints(xList, d1List, d2List, segmentAxis, sx, sd1, sd2, elements
     d3WarpedUnitList = []
 
     for nAlongSegment in range(elementsCountAlongSegment + 1):
-        xElementAlongSegment = xList[elementsCountAround*nAlongSegment: elementsCountAround*(nAlongSegment+1)]
-        d1ElementAlongSegment = d1List[elementsCountAround*nAlongSegment: elementsCountAround*(nAlongSegment+1)]
-        d2ElementAlongSegment = d2List[elementsCountAround*nAlongSegment: elementsCountAround*(nAlongSegment+1)]
+        faceStartIdx = elementsCountAround * nAlongSegment
+        xFace = np.array(xList[faceStartIdx: faceStartIdx + elementsCountAround])
+        d1Face = np.array(d1List[faceStartIdx: faceStartIdx + elementsCountAround])
+        d2Face = np.array(d2List[faceStartIdx: faceStartIdx + elementsCountAround])
 
         centroid = [0.0, 0.0, refPointZ[nAlongSegment]]
 
@@ -125,123 +126,228 @@ def warpSegmentPoints(xList, d1List, d2List, segmentAxis, sx, sd1, sd2, elements
             axisRot = vector.normalise(cp)
             thetaRot = math.acos(vector.dotproduct(segmentAxis, unitTangent))
             rotFrame = matrix.getRotationMatrixFromAxisAngle(axisRot, thetaRot)
-            centroidRot = [rotFrame[j][0]*centroid[0] + rotFrame[j][1]*centroid[1] + rotFrame[j][2]*centroid[2] for j in range(3)]
-
-        else: # path tangent parallel to segment axis (z-axis)
-            if dp == -1.0: # path tangent opposite direction to segment axis
-                thetaRot = math.pi
-                axisRot = [1.0, 0, 0]
-                rotFrame = matrix.getRotationMatrixFromAxisAngle(axisRot, thetaRot)
-                centroidRot = [rotFrame[j][0] * centroid[0] + rotFrame[j][1] * centroid[1] + rotFrame[j][2] * centroid[2] for j in range(3)]
-
-            else: # segment axis in same direction as unit tangent
-                rotFrame = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
-                centroidRot = centroid
+        elif dp == -1.0: # path tangent opposite direction to segment axis
+            thetaRot = math.pi
+            axisRot = [1.0, 0, 0]
+            rotFrame = matrix.getRotationMatrixFromAxisAngle(axisRot, thetaRot)
+        else: # segment axis in same direction as unit tangent
+            rotFrame = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+        rotFrameArray = np.array(rotFrame, dtype=np.float64)
+        centroidRot = [rotFrame[j][0]*centroid[0] + rotFrame[j][1]*centroid[1] + rotFrame[j][2]*centroid[2]
+                       for j in range(3)]
 
         translateMatrix = [sx[nAlongSegment][j] - centroidRot[j] for j in range(3)]
 
-        for n1 in range(elementsCountAround):
-            x = xElementAlongSegment[n1]
-            d1 = d1ElementAlongSegment[n1]
-            d2 = d2ElementAlongSegment[n1]
-
-            if vector.magnitude(cp)> 0.0: # path tangent not parallel to segment axis
-                xRot1 = [rotFrame[j][0]*x[0] + rotFrame[j][1]*x[1] + rotFrame[j][2]*x[2] for j in range(3)]
-                d1Rot1 = [rotFrame[j][0]*d1[0] + rotFrame[j][1]*d1[1] + rotFrame[j][2]*d1[2] for j in range(3)]
-                d2Rot1 = [rotFrame[j][0]*d2[0] + rotFrame[j][1]*d2[1] + rotFrame[j][2]*d2[2] for j in range(3)]
-                # xTranslate = [xRot1[j] + translateMatrix[j] for j in range(3)]
-
-            else: # path tangent parallel to segment axis
-                xRot1 = [rotFrame[j][0]*x[0] + rotFrame[j][1]*x[1] + rotFrame[j][2]*x[2] for j in range(3)] if dp == -1.0 else x
-                d1Rot1 = [rotFrame[j][0]*d1[0] + rotFrame[j][1]*d1[1] + rotFrame[j][2]*d1[2] for j in range(3)] if dp == -1.0 else d1
-                d2Rot1 = [rotFrame[j][0]*d2[0] + rotFrame[j][1]*d2[1] + rotFrame[j][2]*d2[2] for j in range(3)] if dp == -1.0 else d2
-                # xTranslate = [xRot1[j] + translateMatrix[j] for j in range(3)]
-
-            if n1 == 0:  # Find angle between xCentroidRot and first node in the face
-                vectorToFirstNode = [xRot1[c] - centroidRot[c] for c in range(3)]
-                if vector.magnitude(vectorToFirstNode) > 0.0:
-                    cp = vector.crossproduct3(vector.normalise(vectorToFirstNode), vector.normalise(sd2[nAlongSegment]))
-                    if vector.magnitude(cp) > 1e-7:
-                        cp = vector.normalise(cp)
-                        signThetaRot2 = vector.dotproduct(unitTangent, cp)
-                        thetaRot2 = math.acos(
-                            vector.dotproduct(vector.normalise(vectorToFirstNode), vector.normalise(sd2[nAlongSegment])))
-                        axisRot2 = unitTangent
-                        rotFrame2 = matrix.getRotationMatrixFromAxisAngle(axisRot2, signThetaRot2*thetaRot2)
-                    else:
-                        rotFrame2 = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
-                else:
-                    rotFrame2 = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
-
-            xRot2 = [rotFrame2[j][0]*xRot1[0] + rotFrame2[j][1]*xRot1[1] + rotFrame2[j][2]*xRot1[2] for j in range(3)]
-            d1Rot2 = [rotFrame2[j][0]*d1Rot1[0] + rotFrame2[j][1]*d1Rot1[1] + rotFrame2[j][2]*d1Rot1[2] for j in range(3)]
-            d2Rot2 = [rotFrame2[j][0]*d2Rot1[0] + rotFrame2[j][1]*d2Rot1[1] + rotFrame2[j][2]*d2Rot1[2] for j in range(3)]
-            xTranslate = [xRot2[j] + translateMatrix[j] for j in range(3)]
-
-            xWarpedList.append(xTranslate)
-            d1WarpedList.append(d1Rot2)
-            d2WarpedList.append(d2Rot2)
-
-    # Scale d2 with curvature of central path
-    d2WarpedListScaled = []
-    for nAlongSegment in range(elementsCountAlongSegment + 1):
-        for n1 in range(elementsCountAround):
-            n = nAlongSegment * elementsCountAround + n1
-            # Calculate norm
-            sd1Normalised = vector.normalise(sd1[nAlongSegment])
-            v = [xWarpedList[n][c] - sx[nAlongSegment][c] for c in range(3)]
-            dp = vector.dotproduct(v, sd1Normalised)
-            dpScaled = [dp * c for c in sd1Normalised]
-            vProjected = [v[c] - dpScaled[c] for c in range(3)]
-            if vector.magnitude(vProjected) > 0.0:
-                vProjectedNormalised = vector.normalise(vProjected)
-            else:
-                vProjectedNormalised = [0.0, 0.0, 0.0]
-
-            # Calculate curvature along at each node
-            if nAlongSegment == 0:
-                curvature = interp.getCubicHermiteCurvature(sx[0], sd1[0], sx[1], sd1[1], vProjectedNormalised, 0.0)
-            elif nAlongSegment == elementsCountAlongSegment:
-                curvature = interp.getCubicHermiteCurvature(sx[-2], sd1[-2], sx[-1], sd1[-1], vProjectedNormalised, 1.0)
+        # Find angle between xCentroidRot and first node in the face, from the
+        # first node rotated alone; the full face is rotated once below with
+        # both rotations combined
+        xFirstRot1 = rotFrameArray @ xFace[0]
+        vectorToFirstNode = [xFirstRot1[c] - centroidRot[c] for c in range(3)]
+        if vector.magnitude(vectorToFirstNode) > 0.0:
+            cp2 = vector.crossproduct3(vector.normalise(vectorToFirstNode), vector.normalise(sd2[nAlongSegment]))
+            if vector.magnitude(cp2) > 1e-7:
+                cp2 = vector.normalise(cp2)
+                signThetaRot2 = vector.dotproduct(unitTangent, cp2)
+                thetaRot2 = math.acos(
+                    vector.dotproduct(vector.normalise(vectorToFirstNode), vector.normalise(sd2[nAlongSegment])))
+                axisRot2 = unitTangent
+                rotFrame2 = matrix.getRotationMatrixFromAxisAngle(axisRot2, signThetaRot2*thetaRot2)
             else:
-                curvature = 0.5 * (interp.getCubicHermiteCurvature(sx[nAlongSegment - 1], sd1[nAlongSegment - 1],
+                rotFrame2 = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+        else:
+            rotFrame2 = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+        # fuse both rotations into one matrix so each face is rotated once
+        rotCombinedT = (np.array(rotFrame2, dtype=np.float64) @ rotFrameArray).T
+
+        xWarpedList += (xFace @ rotCombinedT + translateMatrix).tolist()
+        d1WarpedList += (d1Face @ rotCombinedT).tolist()
+        d2WarpedList += (d2Face @ rotCombinedT).tolist()
+
+    # Scale d2 with curvature of central path, a whole face at a time
+    xWarpedArray = np.array(xWarpedList).reshape(elementsCountAlongSegment + 1, elementsCountAround, 3)
+    d2WarpedArray = np.array(d2WarpedList).reshape(elementsCountAlongSegment + 1, elementsCountAround, 3)
+    d2ScaledArray = np.empty_like(d2WarpedArray)
+    for nAlongSegment in range(elementsCountAlongSegment + 1):
+        # Calculate norms
+        sd1Normalised = np.array(vector.normalise(sd1[nAlongSegment]))
+        vFace = xWarpedArray[nAlongSegment] - np.array(sx[nAlongSegment])
+        dp = _dotOfRows(vFace, sd1Normalised)
+        vProjected = vFace - dp[:, None]*sd1Normalised
+        magProjected = _magnitudeOfRows(vProjected)[:, None]
+        projectable = magProjected > 0.0
+        vProjectedNormalised = np.where(projectable, vProjected/np.where(projectable, magProjected, 1.0), 0.0)
+
+        # Calculate curvature along at each node of the face
+        if nAlongSegment == 0:
+            curvatureFace = _getCubicHermiteCurvaturesOnCurve(sx[0], sd1[0], sx[1], sd1[1],
+                                                              vProjectedNormalised, 0.0)
+        elif nAlongSegment == elementsCountAlongSegment:
+            curvatureFace = _getCubicHermiteCurvaturesOnCurve(sx[-2], sd1[-2], sx[-1], sd1[-1],
+                                                              vProjectedNormalised, 1.0)
+        else:
+            curvatureFace = 0.5*(_getCubicHermiteCurvaturesOnCurve(sx[nAlongSegment - 1], sd1[nAlongSegment - 1],
                                                                    sx[nAlongSegment], sd1[nAlongSegment],
                                                                    vProjectedNormalised, 1.0) +
-                                   interp.getCubicHermiteCurvature(sx[nAlongSegment], sd1[nAlongSegment],
+                                 _getCubicHermiteCurvaturesOnCurve(sx[nAlongSegment], sd1[nAlongSegment],
                                                                    sx[nAlongSegment + 1], sd1[nAlongSegment + 1],
                                                                    vProjectedNormalised, 0.0))
-            # Scale
-            if nAlongSegment < elementsCountAlongSegment:
-                factor = 1.0 - curvature * vector.magnitude(v)
-                d2 = [factor * c for c in d2WarpedList[n]]
-                d2WarpedListScaled.append(d2)
-            else:
-                d2WarpedListScaled.append(d2WarpedList[n])
+        # Scale
+        if nAlongSegment < elementsCountAlongSegment:
+            factors = 1.0 - curvatureFace*_magnitudeOfRows(vFace)
+            d2ScaledArray[nAlongSegment] = factors[:, None]*d2WarpedArray[nAlongSegment]
+        else:
+            d2ScaledArray[nAlongSegment] = d2WarpedArray[nAlongSegment]
+
+    # Smooth d2 for all lines along the segment in one batched call
+    smoothd2Array = _smoothCubicHermiteDerivativesLines(xWarpedArray.transpose(1, 0, 2),
+                                                        d2ScaledArray.transpose(1, 0, 2),
+                                                        fixStartDerivative=True, fixEndDerivative=True)
+
+    # Re-arrange smoothd2 from per-line-along to per-face-around order
+    d2WarpedListFinal += smoothd2Array.transpose(1, 0, 2).reshape(-1, 3).tolist()
+
+    # Calculate unit d3 with one batched cross product
+    d1Array = np.array(d1WarpedList)
+    d2Array = np.array(d2WarpedListFinal)
+    d1Unit = d1Array/_magnitudeOfRows(d1Array)[:, None]
+    d2Unit = d2Array/_magnitudeOfRows(d2Array)[:, None]
+    d3Array = np.cross(d1Unit, d2Unit)
+    d3WarpedUnitList += (d3Array/_magnitudeOfRows(d3Array)[:, None]).tolist()
 
-    # Smooth d2 for segment
-    smoothd2Raw = []
-    for n1 in range(elementsCountAround):
-        nx = []
-        nd2 = []
-        for n2 in range(elementsCountAlongSegment + 1):
-            n = n2*elementsCountAround + n1
-            nx.append(xWarpedList[n])
-            nd2.append(d2WarpedListScaled[n])
-        smoothd2 = interp.smoothCubicHermiteDerivativesLine(nx, nd2, fixStartDerivative=True, fixEndDerivative=True)
-        smoothd2Raw.append(smoothd2)
-
-    # Re-arrange smoothd2
-    for n2 in range(elementsCountAlongSegment + 1):
-        for n1 in range(elementsCountAround):
-            d2WarpedListFinal.append(smoothd2Raw[n1][n2])
+    return xWarpedList, d1WarpedList, d2WarpedListFinal, d3WarpedUnitList
 
-    # Calculate unit d3
-    for n in range(len(xWarpedList)):
-        d3Unit = vector.normalise(vector.crossproduct3(vector.normalise(d1WarpedList[n]),
-                                                       vector.normalise(d2WarpedListFinal[n])))
-        d3WarpedUnitList.append(d3Unit)
+def _dotOfRows(a, b):
+    """
+    Row-wise numpy version of vector.dotproduct; explicit column sums keep the
+    operation order, and hence results, bit-identical to the scalar version.
+    :param a, b: (..., 3) arrays.
+    :return: (...,) array of dot products of corresponding rows of a and b.
+    """
+    return a[..., 0]*b[..., 0] + a[..., 1]*b[..., 1] + a[..., 2]*b[..., 2]
 
-    return xWarpedList, d1WarpedList, d2WarpedListFinal, d3WarpedUnitList
+def _magnitudeOfRows(a):
+    """
+    Row-wise numpy version of vector.magnitude; explicit column sums keep the
+    operation order, and hence results, bit-identical to the scalar version.
+    :param a: (..., 3) array.
+    :return: (...,) array of magnitudes of the rows of a.
+    """
+    return np.sqrt(a[..., 0]*a[..., 0] + a[..., 1]*a[..., 1] + a[..., 2]*a[..., 2])
+
+def _smoothCubicHermiteDerivativesLines(nx, nd1, fixStartDerivative=False, fixEndDerivative=False):
+    """
+    Batched equivalent of interp.smoothCubicHermiteDerivativesLine over many
+    lines of equal length, limited to the options used in this module.
+    Every operation keeps the scalar order of arithmetic and each line stops
+    iterating at its own convergence, so results are bit-identical to
+    smoothing the lines one at a time.
+    :param nx: Array of shape (lines, nodes, 3) of coordinates along each line.
+    :param nd1: Array of shape (lines, nodes, 3) of initial derivatives.
+    :param fixStartDerivative, fixEndDerivative: Set to True to fix derivative
+    direction and magnitude at the respective end.
+    :return: Array of shape (lines, nodes, 3) of smoothed derivatives.
+    """
+    linesCount = nx.shape[0]
+    nodesCount = nx.shape[1]
+    elementsCount = nodesCount - 1
+    assert elementsCount > 0, '_smoothCubicHermiteDerivativesLines.  Too few nodes/elements'
+    if (elementsCount == 1) and not (fixStartDerivative or fixEndDerivative):
+        # special case: straight lines
+        delta = nx[:, 1] - nx[:, 0]
+        return np.stack((delta, delta), axis=1)
+    md1 = np.array(nd1, dtype=float)
+    tol = 1.0E-6
+    activeIndexes = np.arange(linesCount)
+    for iter in range(100):
+        ax = nx[activeIndexes]
+        amd1 = md1[activeIndexes]
+        lastmd1 = amd1.copy()
+        # arc lengths of all elements by 4 point Gaussian quadrature
+        v1 = ax[:, :-1]
+        d1 = amd1[:, :-1]
+        v2 = ax[:, 1:]
+        d2 = amd1[:, 1:]
+        arcLengths = None
+        for i in range(4):
+            xi = interp.gaussXi4[i]
+            xi2 = xi*xi
+            f1 = -6.0*xi + 6.0*xi2
+            f2 = 1.0 - 4.0*xi + 3.0*xi2
+            f3 = 6.0*xi - 6.0*xi2
+            f4 = -2.0*xi + 3.0*xi2
+            dm = f1*v1 + f2*d1 + f3*v2 + f4*d2
+            term = interp.gaussWt4[i]*np.sqrt(_dotOfRows(dm, dm))
+            arcLengths = term if (arcLengths is None) else (arcLengths + term)
+        # start: interpolateLagrangeHermiteDerivative at xi = 0.0
+        if not fixStartDerivative:
+            amd1[:, 0] = ax[:, 0]*-2.0 + ax[:, 1]*2.0 - lastmd1[:, 1]
+        # middle: mean of directions to neighbours, scaled to mean arc length
+        if nodesCount > 2:
+            dirm = ax[:, 1:-1] - ax[:, :-2]
+            dirp = ax[:, 2:] - ax[:, 1:-1]
+            arcm = arcLengths[:, :-1]
+            arcp = arcLengths[:, 1:]
+            arcLengthmp = arcm + arcp
+            wm = arcp/arcLengthmp
+            wp = arcm/arcLengthmp
+            mid = wm[:, :, None]*dirm + wp[:, :, None]*dirp
+            mag = 0.5*(arcm + arcp)
+            oldMag = _magnitudeOfRows(mid)
+            nonZero = oldMag != 0.0
+            scale = np.where(nonZero, mag/np.where(nonZero, oldMag, 1.0), 0.0)
+            amd1[:, 1:-1] = mid*scale[:, :, None]
+        # end: interpolateHermiteLagrangeDerivative at xi = 1.0
+        if not fixEndDerivative:
+            amd1[:, -1] = ax[:, -2]*-2.0 - lastmd1[:, -2] + ax[:, -1]*2.0
+        md1[activeIndexes] = amd1
+        # per-line convergence; sum arc lengths in scalar order
+        sumArcLengths = arcLengths[:, 0].copy()
+        for e in range(1, elementsCount):
+            sumArcLengths += arcLengths[:, e]
+        dtol = tol*sumArcLengths/elementsCount
+        converged = (np.abs(amd1 - lastmd1) <= dtol[:, None, None]).all(axis=(1, 2))
+        activeIndexes = activeIndexes[~converged]
+        if activeIndexes.size == 0:
+            return md1
+    print('_smoothCubicHermiteDerivativesLines max iters reached:', iter + 1, 'for', activeIndexes.size, 'lines')
+    return md1
+
+def _getCubicHermiteCurvatureOnRing(v1, d1, v2, d2, radialVectors, xi):
+    """
+    Row-wise numpy version of interp.getCubicHermiteCurvature for a ring of points.
+    :param v1, v2: (N, 3) arrays of values at xi = 0.0 and xi = 1.0, respectively.
+    :param d1, d2: (N, 3) arrays of derivatives w.r.t. xi at xi = 0.0 and xi = 1.0, respectively.
+    :param radialVectors: (N, 3) array of unit radial directions, normal to curve tangents.
+    :param xi: Scalar position in curve, nominally in [0.0, 1.0].
+    :return: (N,) array of scalar curvatures (1/R) of the 1-D cubic Hermite curves.
+    """
+    xi2 = xi*xi
+    tangent = (-6.0*xi + 6.0*xi2)*v1 + (1.0 - 4.0*xi + 3.0*xi2)*d1 + \
+              (6.0*xi - 6.0*xi2)*v2 + (-2.0*xi + 3.0*xi2)*d2
+    dTangent = (-6.0 + 12.0*xi)*v1 + (-4.0 + 6.0*xi)*d1 + (6.0 - 12.0*xi)*v2 + (-2.0 + 6.0*xi)*d2
+    radialCurvature = _dotOfRows(dTangent, radialVectors)
+    magTangent = _magnitudeOfRows(tangent)
+    return radialCurvature/(magTangent*magTangent)
+
+def _getCubicHermiteCurvaturesOnCurve(v1, d1, v2, d2, radialVectors, xi):
+    """
+    Curvatures of one cubic Hermite curve resolved against many radial vectors.
+    :param v1, v2: Values at xi = 0.0 and xi = 1.0, respectively.
+    :param d1, d2: Derivatives w.r.t. xi at xi = 0.0 and xi = 1.0, respectively.
+    :param radialVectors: (N, 3) array of unit radial directions, normal to curve tangent.
+    :param xi: Scalar position in curve, nominally in [0.0, 1.0].
+    :return: (N,) array of scalar curvatures (1/R) of the curve at xi.
+    """
+    v1 = np.asarray(v1)
+    d1 = np.asarray(d1)
+    v2 = np.asarray(v2)
+    d2 = np.asarray(d2)
+    xi2 = xi*xi
+    tangent = (-6.0*xi + 6.0*xi2)*v1 + (1.0 - 4.0*xi + 3.0*xi2)*d1 + \
+              (6.0*xi - 6.0*xi2)*v2 + (-2.0*xi + 3.0*xi2)*d2
+    dTangent = (-6.0 + 12.0*xi)*v1 + (-4.0 + 6.0*xi)*d1 + (6.0 - 12.0*xi)*v2 + (-2.0 + 6.0*xi)*d2
+    magTangent = math.sqrt(_dotOfRows(tangent, tangent))
+    return _dotOfRows(radialVectors, dTangent)/(magTangent*magTangent)
 
 def extrudeSurfaceCoordinates(xSurf, d1Surf, d2Surf, d3Surf, wallThicknessList, relativeThicknessList,
                               elementsCountAround, elementsCountAlong, elementsCountThroughWall, transitElementList,
@@ -264,9 +370,33 @@ def extrudeSurfaceCoordinates(xSurf, d1Surf, d2Surf, d3Surf, wallThicknessList,
     return nodes and derivatives for mesh, and curvature along extruded surface.
     """
 
-    xExtrudedSurf = []
+    xSurfArray = np.array(xSurf)
+    d1SurfArray = np.array(d1Surf)
+    d2SurfArray = np.array(d2Surf)
+    d3SurfArray = np.array(d3Surf)
+    d3UnitArray = d3SurfArray / _magnitudeOfRows(d3SurfArray)[:, None]
+    # extrude the whole surface in one broadcast: per-row displacement is the
+    # signed wall thickness of the ring the node belongs to
+    wallDisplacements = np.repeat(
+        [wallThickness if outward else -wallThickness for wallThickness in wallThicknessList], elementsCountAround)
+    xExtrudedArray = xSurfArray + d3SurfArray * wallDisplacements[:, None]
+    # curvature along the tube: evaluate both ends of every along-edge once for
+    # the whole surface, then average the two edge values on interior faces
+    kappaStart = _getCubicHermiteCurvatureOnRing(
+        xSurfArray[:-elementsCountAround], d2SurfArray[:-elementsCountAround],
+        xSurfArray[elementsCountAround:], d2SurfArray[elementsCountAround:],
+        d3UnitArray[:-elementsCountAround], 0.0)
+    kappaEnd = _getCubicHermiteCurvatureOnRing(
+        xSurfArray[:-elementsCountAround], d2SurfArray[:-elementsCountAround],
+        xSurfArray[elementsCountAround:], d2SurfArray[elementsCountAround:],
+        d3UnitArray[elementsCountAround:], 1.0)
+    curvatureAlongArray = np.empty(len(xSurf))
+    curvatureAlongArray[:elementsCountAround] = kappaStart[:elementsCountAround]
+    curvatureAlongArray[-elementsCountAround:] = kappaEnd[-elementsCountAround:]
+    curvatureAlongArray[elementsCountAround:-elementsCountAround] = \
+        0.5*(kappaEnd[:-elementsCountAround] + kappaStart[elementsCountAround:])
+    curvatureAlong = curvatureAlongArray.tolist()
     curvatureAroundSurf = []
-    curvatureAlong = []
     curvatureList = []
     xList = []
     d1List = []
@@ -287,22 +417,37 @@ def extrudeSurfaceCoordinates(xSurf, d1Surf, d2Surf, d3Surf, wallThicknessList,
             xi3List.append(xi3)
         relativeThicknessList.append(relativeThicknessList[-1])
 
+    # through-wall interpolation parameters are the same for every ring: build the
+    # xi3 column and Hermite basis weights once and broadcast per ring below
+    xi3Column = np.array([xi3List[n3] if relativeThicknessList else 1.0/elementsCountThroughWall * n3
+                          for n3 in range(elementsCountThroughWall + 1)])[:, None, None]
+    xi3Sq = xi3Column*xi3Column
+    xi3Cu = xi3Sq*xi3Column
+    f1 = 1.0 - 3.0*xi3Sq + 2.0*xi3Cu
+    f2 = xi3Column - 2.0*xi3Sq + xi3Cu
+    f3 = 3.0*xi3Sq - 2.0*xi3Cu
+    f4 = -xi3Sq + xi3Cu
+    xiThickness = xi3Column[:, :, 0] if outward else (1.0 - xi3Column[:, :, 0])
+    relativeThicknessColumn = np.array(
+        [relativeThicknessList[n3] if relativeThicknessList else 1.0/elementsCountThroughWall
+         for n3 in range(elementsCountThroughWall + 1)])[:, None, None]
+
     for n2 in range(elementsCountAlong + 1):
         wallThickness = wallThicknessList[n2]
         wallOutwardDisplacement = wallThickness if outward else -wallThickness
+        # Calculate curvature along elements around: batch the whole ring with
+        # the previous/next neighbours obtained by rolling the ring arrays
+        ringSlice = slice(n2*elementsCountAround, (n2 + 1)*elementsCountAround)
+        xRing = xSurfArray[ringSlice]
+        d1Ring = d1SurfArray[ringSlice]
+        radialRing = d3UnitArray[ringSlice]
+        kappamRing = _getCubicHermiteCurvatureOnRing(
+            np.roll(xRing, 1, axis=0), np.roll(d1Ring, 1, axis=0), xRing, d1Ring, radialRing, 1.0)
+        kappapRing = _getCubicHermiteCurvatureOnRing(
+            xRing, d1Ring, np.roll(xRing, -1, axis=0), np.roll(d1Ring, -1, axis=0), radialRing, 0.0)
         for n1 in range(elementsCountAround):
-            n = n2*elementsCountAround + n1
-            norm = d3Surf[n]
-            # Calculate extruded coordinates
-            x = [xSurf[n][i] + norm[i]*wallOutwardDisplacement for i in range(3)]
-            xExtrudedSurf.append(x)
-            # Calculate curvature along elements around
-            prevIdx = n - 1 if (n1 != 0) else (n2 + 1)*elementsCountAround - 1
-            nextIdx = n + 1 if (n1 < elementsCountAround - 1) else n2*elementsCountAround
-            kappam = interp.getCubicHermiteCurvature(xSurf[prevIdx], d1Surf[prevIdx], xSurf[n], d1Surf[n],
-                                                     vector.normalise(d3Surf[n]), 1.0)
-            kappap = interp.getCubicHermiteCurvature(xSurf[n], d1Surf[n], xSurf[nextIdx], d1Surf[nextIdx],
-                                                     vector.normalise(d3Surf[n]), 0.0)
+            kappam = kappamRing[n1]
+            kappap = kappapRing[n1]
             if not transitElementList[n1] and not transitElementList[(n1-1)%elementsCountAround]:
                 curvatureAround = 0.5*(kappam + kappap)
             elif transitElementList[n1]:
@@ -311,85 +456,57 @@ def extrudeSurfaceCoordinates(xSurf, d1Surf, d2Surf, d3Surf, wallThicknessList,
                 curvatureAround = kappap
             curvatureAroundSurf.append(curvatureAround)
 
-            # Calculate curvature along
-            if n2 == 0:
-                curvature = interp.getCubicHermiteCurvature(xSurf[n], d2Surf[n], xSurf[n + elementsCountAround],
-                                                            d2Surf[n + elementsCountAround],
-                                                            vector.normalise(d3Surf[n]), 0.0)
-            elif n2 == elementsCountAlong:
-                curvature = interp.getCubicHermiteCurvature(xSurf[n - elementsCountAround],
-                                                            d2Surf[n - elementsCountAround],
-                                                            xSurf[n], d2Surf[n], vector.normalise(d3Surf[n]), 1.0)
-            else:
-                curvature = 0.5*(
-                    interp.getCubicHermiteCurvature(xSurf[n - elementsCountAround], d2Surf[n - elementsCountAround],
-                                                    xSurf[n], d2Surf[n], vector.normalise(d3Surf[n]), 1.0) +
-                    interp.getCubicHermiteCurvature(xSurf[n], d2Surf[n],
-                                                    xSurf[n + elementsCountAround], d2Surf[n + elementsCountAround],
-                                                    vector.normalise(d3Surf[n]), 0.0))
-            curvatureAlong.append(curvature)
-
-        for n3 in range(elementsCountThroughWall + 1):
-            xi3 = xi3List[n3] if relativeThicknessList else 1.0/elementsCountThroughWall * n3
-            xDistalAround = []
-            d1DistalAround = []
-            d2DistalAround = []
-            d3DistalAround = []
-            localIdxDistalAround = []
-
-            for n1 in range(elementsCountAround):
-                if n2 == 0 and xProximal:
+        if n2 == 0 and xProximal:
+            for n3 in range(elementsCountThroughWall + 1):
+                for n1 in range(elementsCountAround):
                     xList.append(xProximal[n3][n1])
                     d1List.append(d1Proximal[n3][n1])
                     d2List.append(d2Proximal[n3][n1])
                     d3List.append(d3Proximal[n3][n1])
-                    n = n2 * elementsCountAround + n1
-                    curvatureList.append(curvatureAlong[n])
-                else:
-                    n = n2*elementsCountAround + n1
-                    norm = d3Surf[n]
-                    surfx = xSurf[n]
-                    extrudedx = xExtrudedSurf[n]
-                    # x
-                    dWall = [wallThickness * c for c in norm]
-                    if outward:
-                        x = interp.interpolateCubicHermite(surfx, dWall, extrudedx, dWall, xi3)
-                    else:
-                        x = interp.interpolateCubicHermite(extrudedx, dWall, surfx, dWall, xi3)
-                    xList.append(x)
-
-                    # dx_ds1
-                    factor = 1.0 - wallOutwardDisplacement * (xi3 if outward else (1.0 - xi3)) * curvatureAroundSurf[n]
-                    d1 = [factor*c for c in d1Surf[n]]
-                    d1List.append(d1)
-
-                    # dx_ds2
-                    factor = 1.0 - wallOutwardDisplacement * (xi3 if outward else (1.0 - xi3)) * curvatureAlong[n]
-                    d2 = [factor * c for c in d2Surf[n]]
-                    d2List.append(d2)
-                    curvatureList.append(curvatureAlong[n])
-
-                    # dx_ds3
-                    d3 = [c * wallThickness * (relativeThicknessList[n3] if relativeThicknessList else 1.0/elementsCountThroughWall) for c in norm]
-                    d3List.append(d3)
-
-                if n2 == elementsCountAlong:
-                    xDistalAround.append(x)
-                    d1DistalAround.append(d1)
-                    d2DistalAround.append(d2)
-                    d3DistalAround.append(d3)
-                    localIdxDistalAround.append(count)
-                count += 1
-
-            if n2 == elementsCountAlong:
-                xDistal.append(xDistalAround)
-                d1Distal.append(d1DistalAround)
-                d2Distal.append(d2DistalAround)
-                d3Distal.append(d3DistalAround)
-                localIdxDistal.append(localIdxDistalAround)
+                    curvatureList.append(curvatureAlong[n1])
+                    count += 1
+            continue
+
+        # interpolate all through-wall layers of the ring in one broadcast
+        normRing = d3SurfArray[ringSlice]
+        dWallRing = wallThickness*normRing
+        surfxRing = xSurfArray[ringSlice]
+        extrudedxRing = xExtrudedArray[ringSlice]
+        if outward:
+            xLayers = f1*surfxRing + f2*dWallRing + f3*extrudedxRing + f4*dWallRing
+        else:
+            xLayers = f1*extrudedxRing + f2*dWallRing + f3*surfxRing + f4*dWallRing
+        curvatureAroundRing = np.array(curvatureAroundSurf[n2*elementsCountAround:(n2 + 1)*elementsCountAround])
+        curvatureAlongRing = curvatureAlong[n2*elementsCountAround:(n2 + 1)*elementsCountAround]
+        d1Layers = (1.0 - wallOutwardDisplacement*xiThickness*curvatureAroundRing)[:, :, None]*d1SurfArray[ringSlice]
+        d2Layers = (1.0 - wallOutwardDisplacement*xiThickness*np.array(curvatureAlongRing))[:, :, None]*d2SurfArray[ringSlice]
+        d3Layers = normRing*wallThickness*relativeThicknessColumn
+
+        xList += xLayers.reshape(-1, 3).tolist()
+        d1List += d1Layers.reshape(-1, 3).tolist()
+        d2List += d2Layers.reshape(-1, 3).tolist()
+        d3List += d3Layers.reshape(-1, 3).tolist()
+        curvatureList += curvatureAlongRing*(elementsCountThroughWall + 1)
+
+        if n2 == elementsCountAlong:
+            for n3 in range(elementsCountThroughWall + 1):
+                xDistal.append(xLayers[n3].tolist())
+                d1Distal.append(d1Layers[n3].tolist())
+                d2Distal.append(d2Layers[n3].tolist())
+                d3Distal.append(d3Layers[n3].tolist())
+                localIdxDistal.append(list(range(count + n3*elementsCountAround,
+                                                 count + (n3 + 1)*elementsCountAround)))
+        count += (elementsCountThroughWall + 1)*elementsCountAround
 
     return xList, d1List, d2List, d3List, curvatureList, localIdxDistal, xDistal, d1Distal, d2Distal, d3Distal
 
+# Arc length of the flat d2 curve per unit node spacing: the cubic Hermite curve
+# between corresponding nodes on successive faces has both end derivatives set to
+# their difference vector, so it stays on the line between them and its rescaled
+# arc length is this constant times the distance between the nodes.
+_flatD2ArcLengthScale = interp.computeCubicHermiteArcLength([1.0, 0.0, 0.0], [1.0, 0.0, 0.0],
+                                                            [0.0, 0.0, 0.0], [1.0, 0.0, 0.0], True)
+
 def createFlatCoordinates(xiList, lengthAroundList, totalLengthAlong, wallThickness, relativeThicknessList,
                           elementsCountAround, elementsCountAlong, elementsCountThroughWall, transitElementList):
     """
@@ -417,42 +534,35 @@ def createFlatCoordinates(xiList, lengthAroundList, totalLengthAlong, wallThickn
     xFlatList = []
     d1FlatList = []
     d2FlatList = []
+    # z is the same for every face along: compute the column of layer heights once
+    zColumn = np.array([wallThickness * (xi3List[n3] if relativeThicknessList else 1.0 / elementsCountThroughWall * n3)
+                        for n3 in range(elementsCountThroughWall + 1)])
     for n2 in range(elementsCountAlong + 1):
         xiFace = xiList[n2]
         lengthAround = lengthAroundList[n2]
-        d1List = []
-        for n1 in range(len(xiFace)):
-            d1 = (xiFace[n1] - xiFace[n1-1]) if n1 > 0 else (xiFace[n1+1] - xiFace[n1])
-            d1List.append(d1)
+        # backward differences of xi, with the forward difference reused for the first point
+        xiDiffs = np.diff(np.array(xiFace))
+        d1Array = np.concatenate((xiDiffs[:1], xiDiffs))
 
         # To modify derivative along transition elements
-        for i in range(len(transitElementList)):
-            if transitElementList[i]:
-                d1List[i+1] = d1List[i+2]
+        transitIndexes = np.nonzero(transitElementList)[0]
+        d1Array[transitIndexes + 1] = d1Array[transitIndexes + 2]
 
         xPad = (lengthAroundList[0] - lengthAround)*0.5
-        for n3 in range(elementsCountThroughWall + 1):
-            z = wallThickness * (xi3List[n3] if relativeThicknessList else 1.0 / elementsCountThroughWall * n3)
-            for n1 in range(elementsCountAround + 1):
-                xFlat = [xPad + xiFace[n1] * lengthAround,
-                        totalLengthAlong / elementsCountAlong * n2,
-                        z]
-                d1Flat = [ d1List[n1]*lengthAround, 0.0, 0.0 ]
-                xFlatList.append(xFlat)
-                d1FlatList.append(d1Flat)
-
-    for n2 in range(elementsCountAlong):
-        for n3 in range(elementsCountThroughWall + 1):
-            for n1 in range(elementsCountAround + 1 ):
-                nodeIdx = n2*(elementsCountAround + 1)*(elementsCountThroughWall + 1) + n3*(elementsCountAround + 1) + n1
-                nodeNextElementAlong = nodeIdx + (elementsCountAround+1)*(elementsCountThroughWall + 1)
-                # print(nodeIdx + 1, nodeNextElementAlong + 1)
-                v1 = xFlatList[nodeNextElementAlong]
-                v2 = xFlatList[nodeIdx]
-                d1 = d2 = [v1[i] - v2[i] for i in range(3)]
-                arclength = interp.computeCubicHermiteArcLength(v1, d1, v2, d2, True)
-                d2Flat = vector.setMagnitude(d1, arclength)
-                d2FlatList.append(d2Flat)
+        # broadcast the separable face coordinates over all layers at once
+        xFace = np.empty((elementsCountThroughWall + 1, elementsCountAround + 1, 3))
+        xFace[:, :, 0] = xPad + np.array(xiFace[:elementsCountAround + 1])*lengthAround
+        xFace[:, :, 1] = totalLengthAlong / elementsCountAlong * n2
+        xFace[:, :, 2] = zColumn[:, None]
+        xFlatList += xFace.reshape(-1, 3).tolist()
+        d1Face = np.zeros((elementsCountThroughWall + 1, elementsCountAround + 1, 3))
+        d1Face[:, :, 0] = d1Array[:elementsCountAround + 1]*lengthAround
+        d1FlatList += d1Face.reshape(-1, 3).tolist()
+
+    # d2 runs to the same node on the next face along; its rescaled arc length is
+    # proportional to the difference vector, so one scaled diff covers all nodes
+    xFlatArray = np.array(xFlatList).reshape(elementsCountAlong + 1, -1, 3)
+    d2FlatList = (np.diff(xFlatArray, axis=0)*_flatD2ArcLengthScale).reshape(-1, 3).tolist()
     d2FlatList = d2FlatList + d2FlatList[-(elementsCountAround+1)*(elementsCountThroughWall+1):]
 
     return xFlatList, d1FlatList, d2FlatList
@@ -590,9 +700,12 @@ def createNodesAndElements(region,
     elementtemplateApex = mesh.createElementtemplate()
     elementtemplateApex.setElementShapeType(Element.SHAPE_TYPE_CUBE)
 
+    if xFlat or xOrgan:
+        # shared by flat and organ coordinate fields
+        bicubichermitelinear = eftfactory_bicubichermitelinear(mesh, useCrossDerivatives)
+
     if xFlat:
         # Flat coordinates field
-        bicubichermitelinear = eftfactory_bicubichermitelinear(mesh, useCrossDerivatives)
         eftFlat1 = bicubichermitelinear.createEftBasic()
         eftFlat2 = bicubichermitelinear.createEftOpenTube()
 
@@ -621,14 +734,6 @@ def createNodesAndElements(region,
         if useCrossDerivatives:
             flatNodetemplate3.setValueNumberOfVersions(flatCoordinates, -1, Node.VALUE_LABEL_D2_DS1DS2, 1)
 
-        flatElementtemplate1 = mesh.createElementtemplate()
-        flatElementtemplate1.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-        flatElementtemplate1.defineField(flatCoordinates, -1, eftFlat1)
-
-        flatElementtemplate2 = mesh.createElementtemplate()
-        flatElementtemplate2.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-        flatElementtemplate2.defineField(flatCoordinates, -1, eftFlat2)
-
         if closedProximalEnd:
             flatElementtemplateApex1 = mesh.createElementtemplate()
             flatElementtemplateApex1.setElementShapeType(Element.SHAPE_TYPE_CUBE)
@@ -638,7 +743,6 @@ def createNodesAndElements(region,
 
     if xOrgan:
         # Organ coordinates field
-        bicubichermitelinear = eftfactory_bicubichermitelinear(mesh, useCrossDerivatives)
         eftOrgan = bicubichermitelinear.createEftBasic()
 
         organCoordinates = findOrCreateFieldCoordinates(fm, name=organCoordinateFieldName)
@@ -656,13 +760,27 @@ def createNodesAndElements(region,
                 organNodetemplate.setValueNumberOfVersions(organCoordinates, -1, Node.VALUE_LABEL_D2_DS2DS3, 1)
                 organNodetemplate.setValueNumberOfVersions(organCoordinates, -1, Node.VALUE_LABEL_D3_DS1DS2DS3, 1)
 
-        organElementtemplate = mesh.createElementtemplate()
-        organElementtemplate.setElementShapeType(Element.SHAPE_TYPE_CUBE)
-        organElementtemplate.defineField(organCoordinates, -1, eftOrgan)
-
         organElementtemplateApex = mesh.createElementtemplate()
         organElementtemplateApex.setElementShapeType(Element.SHAPE_TYPE_CUBE)
 
+    # define the flat and organ fields on the regular element template too, so
+    # regular elements are created fully defined instead of merged per element
+    if xFlat:
+        elementtemplate.defineField(flatCoordinates, -1, eftFlat1)
+    if xOrgan:
+        elementtemplate.defineField(organCoordinates, -1, eftOrgan)
+    if xFlat:
+        # variant for the last element around, which wraps onto the opening of
+        # the flat coordinates range
+        elementtemplateOpenTube = mesh.createElementtemplate()
+        elementtemplateOpenTube.setElementShapeType(Element.SHAPE_TYPE_CUBE)
+        elementtemplateOpenTube.defineField(coordinates, -1, eft)
+        elementtemplateOpenTube.defineField(flatCoordinates, -1, eftFlat2)
+        if xOrgan:
+            elementtemplateOpenTube.defineField(organCoordinates, -1, eftOrgan)
+    else:
+        elementtemplateOpenTube = elementtemplate
+
     # Create nodes
     # Coordinates field
     if nodeIdProximal:
@@ -677,91 +795,199 @@ def createNodesAndElements(region,
                 newNodeList.append(nodeIdProximal[n3][n1])
                 nodeIdentifier = nodeIdentifier + 1
 
-    for n in range(proximalNodesOffset if nodeIdProximal else 0, len(x)):
-        node = nodes.createNode(nodeIdentifier, nodetemplate)
-        cache.setNode(node)
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, x[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2[n])
-        coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS3, 1, d3[n])
-        if useCrossDerivatives:
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS3, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS2DS3, 1, zero)
-                coordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D3_DS1DS2DS3, 1, zero)
-        # print('NodeIdentifier = ', nodeIdentifier, x[n], d1[n], d2[n])
-        nodeIdentifier = nodeIdentifier + 1
+    # hoist bound methods and labels: the loops below write several parameters
+    # per node and the attribute lookups add up over all nodes
+    createNode = nodes.createNode
+    findNodeByIdentifier = nodes.findNodeByIdentifier
+    setNode = cache.setNode
+    setNodeParameters = coordinates.setNodeParameters
+    valueLabel = Node.VALUE_LABEL_VALUE
+    d_ds1Label = Node.VALUE_LABEL_D_DS1
+    d_ds2Label = Node.VALUE_LABEL_D_DS2
+    d_ds3Label = Node.VALUE_LABEL_D_DS3
+    d2_ds1ds2Label = Node.VALUE_LABEL_D2_DS1DS2
+    d2_ds1ds3Label = Node.VALUE_LABEL_D2_DS1DS3
+    d2_ds2ds3Label = Node.VALUE_LABEL_D2_DS2DS3
+    d3_ds1ds2ds3Label = Node.VALUE_LABEL_D3_DS1DS2DS3
+
+    # hold handles of the nodes created here so the flat/organ sections below
+    # can reuse them instead of re-finding every node by identifier
+    nodesByIdentifier = {}
+
+    # useCrossDerivatives is fixed for the whole build: dispatch once to a
+    # straight-line loop instead of testing it for every node
+    firstN = proximalNodesOffset if nodeIdProximal else 0
+    if useCrossDerivatives:
+        for n in range(firstN, len(x)):
+            node = createNode(nodeIdentifier, nodetemplate)
+            nodesByIdentifier[nodeIdentifier] = node
+            setNode(node)
+            setNodeParameters(cache, -1, valueLabel, 1, x[n])
+            setNodeParameters(cache, -1, d_ds1Label, 1, d1[n])
+            setNodeParameters(cache, -1, d_ds2Label, 1, d2[n])
+            setNodeParameters(cache, -1, d_ds3Label, 1, d3[n])
+            setNodeParameters(cache, -1, d2_ds1ds2Label, 1, zero)
+            setNodeParameters(cache, -1, d2_ds1ds3Label, 1, zero)
+            setNodeParameters(cache, -1, d2_ds2ds3Label, 1, zero)
+            setNodeParameters(cache, -1, d3_ds1ds2ds3Label, 1, zero)
+            nodeIdentifier = nodeIdentifier + 1
+    else:
+        for n in range(firstN, len(x)):
+            node = createNode(nodeIdentifier, nodetemplate)
+            nodesByIdentifier[nodeIdentifier] = node
+            setNode(node)
+            setNodeParameters(cache, -1, valueLabel, 1, x[n])
+            setNodeParameters(cache, -1, d_ds1Label, 1, d1[n])
+            setNodeParameters(cache, -1, d_ds2Label, 1, d2[n])
+            setNodeParameters(cache, -1, d_ds3Label, 1, d3[n])
+            # print('NodeIdentifier = ', nodeIdentifier, x[n], d1[n], d2[n])
+            nodeIdentifier = nodeIdentifier + 1
 
     # Flat coordinates field
     if xFlat:
+        setFlatNodeParameters = flatCoordinates.setNodeParameters
         nodeIdentifier = firstNodeIdentifier
         if closedProximalEnd:
             # Apexes
             for n in range(elementsCountThroughWall + 1):
-                node = nodes.findNodeByIdentifier(nodeIdentifier)
+                node = nodesByIdentifier.get(nodeIdentifier)
+                if node is None:
+                    node = findNodeByIdentifier(nodeIdentifier)
                 node.merge(flatNodetemplate3)
-                cache.setNode(node)
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, xFlat[n])
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1Flat[n])
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 2, d1Flat[n])
-                flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2Flat[n])
+                setNode(node)
+                setFlatNodeParameters(cache, -1, valueLabel, 1, xFlat[n])
+                setFlatNodeParameters(cache, -1, d_ds1Label, 1, d1Flat[n])
+                setFlatNodeParameters(cache, -1, d_ds1Label, 2, d1Flat[n])
+                setFlatNodeParameters(cache, -1, d_ds2Label, 1, d2Flat[n])
                 if useCrossDerivatives:
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
+                    setFlatNodeParameters(cache, -1, d2_ds1ds2Label, 1, zero)
                 nodeIdentifier = nodeIdentifier + 1
         for n2 in range(elementsCountAlong if closedProximalEnd else elementsCountAlong + 1):
             for n3 in range(elementsCountThroughWall + 1):
-                for n1 in range(elementsCountAround):
-                    if closedProximalEnd:
-                        i = n2*(elementsCountAround + 1)*(elementsCountThroughWall + 1) + (elementsCountAround + 1)*n3 + n1 + elementsCountThroughWall + 1
-                    else:
-                        i = n2*(elementsCountAround + 1)*(elementsCountThroughWall + 1) + (elementsCountAround + 1)*n3 + n1
-                    node = nodes.findNodeByIdentifier(nodeIdentifier)
-                    node.merge(flatNodetemplate2 if n1 == 0 else flatNodetemplate1)
-                    cache.setNode(node)
-                    # print('NodeIdentifier', nodeIdentifier, 'version 1, xList Index =', i+1)
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, xFlat[i])
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1Flat[i])
-                    flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2Flat[i])
+                iBase = n2*(elementsCountAround + 1)*(elementsCountThroughWall + 1) + (elementsCountAround + 1)*n3 + \
+                        (elementsCountThroughWall + 1 if closedProximalEnd else 0)
+                # n1 == 0 is peeled out of the loop: the node on the opening
+                # additionally holds version 2 values from the far edge
+                node = nodesByIdentifier.get(nodeIdentifier)
+                if node is None:
+                    node = findNodeByIdentifier(nodeIdentifier)
+                node.merge(flatNodetemplate2)
+                setNode(node)
+                setFlatNodeParameters(cache, -1, valueLabel, 1, xFlat[iBase])
+                setFlatNodeParameters(cache, -1, d_ds1Label, 1, d1Flat[iBase])
+                setFlatNodeParameters(cache, -1, d_ds2Label, 1, d2Flat[iBase])
+                setFlatNodeParameters(cache, -1, valueLabel, 2, xFlat[iBase + elementsCountAround])
+                setFlatNodeParameters(cache, -1, d_ds1Label, 2, d1Flat[iBase + elementsCountAround])
+                setFlatNodeParameters(cache, -1, d_ds2Label, 2, d2Flat[iBase + elementsCountAround])
+                if useCrossDerivatives:
+                    setFlatNodeParameters(cache, -1, d2_ds1ds2Label, 1, zero)
+                    setFlatNodeParameters(cache, -1, d2_ds1ds2Label, 2, zero)
+                nodeIdentifier = nodeIdentifier + 1
+                for n1 in range(1, elementsCountAround):
+                    i = iBase + n1
+                    node = nodesByIdentifier.get(nodeIdentifier)
+                    if node is None:
+                        node = findNodeByIdentifier(nodeIdentifier)
+                    node.merge(flatNodetemplate1)
+                    setNode(node)
+                    setFlatNodeParameters(cache, -1, valueLabel, 1, xFlat[i])
+                    setFlatNodeParameters(cache, -1, d_ds1Label, 1, d1Flat[i])
+                    setFlatNodeParameters(cache, -1, d_ds2Label, 1, d2Flat[i])
                     if useCrossDerivatives:
-                        flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
-                    if n1 == 0:
-                        # print('NodeIdentifier', nodeIdentifier, 'version 2, xList Index =', i+elementsCountAround+1)
-                        flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 2, xFlat[i+elementsCountAround])
-                        flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 2, d1Flat[i+elementsCountAround])
-                        flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 2, d2Flat[i+elementsCountAround])
-                        if useCrossDerivatives:
-                            flatCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 2, zero)
+                        setFlatNodeParameters(cache, -1, d2_ds1ds2Label, 1, zero)
                     nodeIdentifier = nodeIdentifier + 1
 
     # Organ coordinates field
     if xOrgan:
+        setOrganNodeParameters = organCoordinates.setNodeParameters
         nodeIdentifier = firstNodeIdentifier
         for n in range(len(xOrgan)):
-            node = nodes.findNodeByIdentifier(nodeIdentifier)
+            node = nodesByIdentifier.get(nodeIdentifier)
+            if node is None:
+                node = findNodeByIdentifier(nodeIdentifier)
             node.merge(organNodetemplate)
-            cache.setNode(node)
-            organCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_VALUE, 1, xOrgan[n])
-            organCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS1, 1, d1Organ[n])
-            organCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D_DS2, 1, d2Organ[n])
+            setNode(node)
+            setOrganNodeParameters(cache, -1, valueLabel, 1, xOrgan[n])
+            setOrganNodeParameters(cache, -1, d_ds1Label, 1, d1Organ[n])
+            setOrganNodeParameters(cache, -1, d_ds2Label, 1, d2Organ[n])
             if useCrossDerivatives:
-                organCoordinates.setNodeParameters(cache, -1, Node.VALUE_LABEL_D2_DS1DS2, 1, zero)
+                setOrganNodeParameters(cache, -1, d2_ds1ds2Label, 1, zero)
             nodeIdentifier = nodeIdentifier + 1
 
     # create elements
-    radiansPerElementAround = math.pi*2.0 / elementsCountAround
+    radiansPerElementAround = math.tau / elementsCountAround
     radiansPerElementAroundFlat = math.pi / elementsCountAround
+    nextE1 = [(e1 + 1) % elementsCountAround for e1 in range(elementsCountAround)]
     allValueLabels = [Node.VALUE_LABEL_VALUE, Node.VALUE_LABEL_D_DS1, Node.VALUE_LABEL_D_DS2,
                       Node.VALUE_LABEL_D2_DS1DS2]
 
     allAnnotationGroups = []
+    # track merged group names in a set and cache mesh groups so the
+    # per-element bookkeeping below stays O(1) per annotation group
+    allAnnotationGroupNames = set()
+    meshGroupByAnnotationGroup = {}
+
+    def addElementToAnnotationGroups(element, annotationGroups):
+        for annotationGroup in annotationGroups:
+            if annotationGroup._name not in allAnnotationGroupNames:
+                allAnnotationGroupNames.add(annotationGroup._name)
+                allAnnotationGroups.append(annotationGroup)
+            meshGroup = meshGroupByAnnotationGroup.get(annotationGroup)
+            if meshGroup is None:
+                meshGroup = meshGroupByAnnotationGroup[annotationGroup] = annotationGroup.getMeshGroup(mesh)
+            meshGroup.addElement(element)
 
     if closedProximalEnd:
         # Create apex elements
+        # scale factors depend only on the element around: build each list once
+        # with its trig values instead of per wall layer
+        apexScalefactorsList = []
+        apexScalefactorsFlatList = []
+        # neighbouring elements share trig values: tabulate sin/cos once and
+        # look the 'next' values up instead of recomputing them
+        sinAroundTable = [math.sin(e1 * radiansPerElementAround) for e1 in range(elementsCountAround)]
+        cosAroundTable = [math.cos(e1 * radiansPerElementAround) for e1 in range(elementsCountAround)]
+        if xFlat:
+            halfCountAround = elementsCountAround // 2
+            sinFlatTable = [math.sin((e1 - halfCountAround) * radiansPerElementAroundFlat)
+                            for e1 in range(elementsCountAround + 1)]
+            cosFlatTable = [math.cos((e1 - halfCountAround) * radiansPerElementAroundFlat)
+                            for e1 in range(elementsCountAround + 1)]
+        for e1 in range(elementsCountAround):
+            sinRadiansAround = sinAroundTable[e1]
+            cosRadiansAround = cosAroundTable[e1]
+            sinRadiansAroundNext = sinAroundTable[nextE1[e1]]
+            cosRadiansAroundNext = cosAroundTable[nextE1[e1]]
+            apexScalefactorsList.append([
+                -1.0,
+                sinRadiansAround, cosRadiansAround, radiansPerElementAround,
+                sinRadiansAroundNext, cosRadiansAroundNext, radiansPerElementAround,
+                sinRadiansAround, cosRadiansAround, radiansPerElementAround,
+                sinRadiansAroundNext, cosRadiansAroundNext, radiansPerElementAround
+            ])
+            if xFlat:
+                sinRadiansApexFlat = sinFlatTable[e1]
+                cosRadiansApexFlat = cosFlatTable[e1]
+                sinRadiansApexFlatNext = sinFlatTable[e1 + 1]
+                cosRadiansApexFlatNext = cosFlatTable[e1 + 1]
+                apexScalefactorsFlatList.append([
+                    -1.0,
+                    sinRadiansApexFlat, cosRadiansApexFlat, radiansPerElementAroundFlat,
+                    sinRadiansApexFlatNext, cosRadiansApexFlatNext, radiansPerElementAroundFlat,
+                    sinRadiansApexFlat, cosRadiansApexFlat, radiansPerElementAroundFlat,
+                    sinRadiansApexFlatNext, cosRadiansApexFlatNext, radiansPerElementAroundFlat
+                ])
+        # the apex efts depend only on the element around: create each once and
+        # reuse it for every wall layer (the flat eft is left per-element as it
+        # is remapped in place on the opening)
+        eftApexList = [eftfactory.createEftShellPoleBottom(e1 * 100, nextE1[e1] * 100)
+                       for e1 in range(elementsCountAround)]
+        if xOrgan:
+            eftApexOrganList = [eftfactory.createEftShellPoleBottom(e1 * 100, nextE1[e1] * 100)
+                                for e1 in range(elementsCountAround)]
         for e3 in range(elementsCountThroughWall):
             for e1 in range(elementsCountAround):
-                va = e1
-                vb = (e1 + 1) % elementsCountAround
-                eftApex = eftfactory.createEftShellPoleBottom(va * 100, vb * 100)
+                eftApex = eftApexList[e1]
                 elementtemplateApex.defineField(coordinates, -1, eftApex)
                 element = mesh.createElement(elementIdentifier, elementtemplateApex)
                 bni1 = e3 + 1 + startNode - 1
@@ -771,9 +997,7 @@ def createNodesAndElements(region,
                 element.setNodesByIdentifier(eftApex, nodeIdentifiers)
                 onOpening = e1 > elementsCountAround - 2
                 if xOrgan:
-                    vao = e1
-                    vbo = (e1 + 1) % elementsCountAround
-                    eftApexOrgan = eftfactory.createEftShellPoleBottom(vao * 100, vbo * 100)
+                    eftApexOrgan = eftApexOrganList[e1]
                     organElementtemplateApex.defineField(organCoordinates, -1, eftApexOrgan)
                     element.merge(organElementtemplateApex)
                     element.setNodesByIdentifier(eftApexOrgan, nodeIdentifiers)
@@ -787,17 +1011,7 @@ def createNodesAndElements(region,
                     element.merge(flatElementtemplateApex1)
                     element.setNodesByIdentifier(eftApexFlat, nodeIdentifiers)
                     # set general linear map coefficients
-                    e1b = e1 - (elementsCountAround // 2)
-                    radiansAroundApexFlat = e1b * radiansPerElementAroundFlat
-                    radiansAroundApexFlatNext = (e1b + 1) * radiansPerElementAroundFlat
-                    scalefactorsFlat = [
-                        -1.0,
-                        math.sin(radiansAroundApexFlat), math.cos(radiansAroundApexFlat), radiansPerElementAroundFlat,
-                        math.sin(radiansAroundApexFlatNext), math.cos(radiansAroundApexFlatNext), radiansPerElementAroundFlat,
-                        math.sin(radiansAroundApexFlat), math.cos(radiansAroundApexFlat), radiansPerElementAroundFlat,
-                        math.sin(radiansAroundApexFlatNext), math.cos(radiansAroundApexFlatNext), radiansPerElementAroundFlat
-                    ]
-                    result = element.setScaleFactors(eftApexFlat, scalefactorsFlat)
+                    result = element.setScaleFactors(eftApexFlat, apexScalefactorsFlatList[e1])
                     if onOpening:
                         lnRemapV2 = [3, 6]
                         eftApexOpen = eftApexFlat
@@ -808,44 +1022,39 @@ def createNodesAndElements(region,
                         if eftApexOpen.getNumberOfLocalScaleFactors() > 0:
                             element.setScaleFactor(eftApexOpen, 1, -1.0)
                 # set general linear map coefficients
-                radiansAround = e1 * radiansPerElementAround
-                radiansAroundNext = ((e1 + 1) % elementsCountAround) * radiansPerElementAround
-                scalefactors = [
-                    -1.0,
-                    math.sin(radiansAround), math.cos(radiansAround), radiansPerElementAround,
-                    math.sin(radiansAroundNext), math.cos(radiansAroundNext), radiansPerElementAround,
-                    math.sin(radiansAround), math.cos(radiansAround), radiansPerElementAround,
-                    math.sin(radiansAroundNext), math.cos(radiansAroundNext), radiansPerElementAround
-                ]
-                result = element.setScaleFactors(eftApex, scalefactors)
+                result = element.setScaleFactors(eftApex, apexScalefactorsList[e1])
                 elementIdentifier = elementIdentifier + 1
                 annotationGroups = annotationGroupsAround[e1] + annotationGroupsAlong[0] + \
                                    annotationGroupsThroughWall[e3]
                 if annotationGroups:
-                    allAnnotationGroups = mergeAnnotationGroups(allAnnotationGroups, annotationGroups)
-                    for annotationGroup in annotationGroups:
-                        meshGroup = annotationGroup.getMeshGroup(mesh)
-                        meshGroup.addElement(element)
+                    addElementToAnnotationGroups(element, annotationGroups)
 
     # Create regular elements
+    # node identifiers vary by simple strides: look up the wrap-around index
+    # table and compute a base identifier per wall layer, folding in startNode
     now = elementsCountAround * (elementsCountThroughWall + 1)
+    # one list reused for every element: setNodesByIdentifier copies the
+    # contents, so overwriting in place saves an allocation per element
+    nodeIdentifiers = [0]*8
     for e2 in range(1 if closedProximalEnd else 0, elementsCountAlong):
         for e3 in range(elementsCountThroughWall):
+            if closedProximalEnd:
+                base = (e2 - 1) * now + e3 * elementsCountAround + (elementsCountThroughWall + 1) + startNode
+            else:
+                base = e2 * now + e3 * elementsCountAround + startNode
             for e1 in range(elementsCountAround):
-                if closedProximalEnd:
-                    bni11 = (e2-1) * now + e3 * elementsCountAround + e1 + 1 + (elementsCountThroughWall + 1)
-                    bni12 = (e2-1) * now + e3 * elementsCountAround + (e1 + 1) % elementsCountAround + 1 + \
-                            (elementsCountThroughWall + 1)
-                    bni21 = (e2-1) * now + (e3 + 1) * elementsCountAround + e1 + 1 + (elementsCountThroughWall + 1)
-                    bni22 = (e2-1) * now + (e3 + 1) * elementsCountAround + (e1 + 1) % elementsCountAround + 1 + \
-                            (elementsCountThroughWall + 1)
-                else:
-                    bni11 = e2 * now + e3 * elementsCountAround + e1 + 1
-                    bni12 = e2 * now + e3 * elementsCountAround + (e1 + 1) % elementsCountAround + 1
-                    bni21 = e2 * now + (e3 + 1) * elementsCountAround + e1 + 1
-                    bni22 = e2 * now + (e3 + 1) * elementsCountAround + (e1 + 1) % elementsCountAround + 1
-                nodeIdentifiers = [bni11, bni12, bni11 + now, bni12 + now, bni21, bni22, bni21 + now, bni22 + now]
-                nodeIdentifiers = [startNode - 1 + c for c in nodeIdentifiers]
+                bni11 = base + e1
+                bni12 = base + nextE1[e1]
+                bni21 = bni11 + elementsCountAround
+                bni22 = bni12 + elementsCountAround
+                nodeIdentifiers[0] = bni11
+                nodeIdentifiers[1] = bni12
+                nodeIdentifiers[2] = bni11 + now
+                nodeIdentifiers[3] = bni12 + now
+                nodeIdentifiers[4] = bni21
+                nodeIdentifiers[5] = bni22
+                nodeIdentifiers[6] = bni21 + now
+                nodeIdentifiers[7] = bni22 + now
                 if e2 == 0 and nodeIdProximal:
                     for m in range(len(nodeIdentifiers)):
                         if nodeIdentifiers[m] in nodeList:
@@ -853,23 +1062,19 @@ def createNodesAndElements(region,
                             nodeIdentifiers[m] = newNodeList[idx]
 
                 onOpening = e1 > elementsCountAround - 2
-                element = mesh.createElement(elementIdentifier, elementtemplate)
+                element = mesh.createElement(elementIdentifier,
+                                             elementtemplateOpenTube if onOpening else elementtemplate)
                 element.setNodesByIdentifier(eft, nodeIdentifiers)
                 if xFlat:
-                    element.merge(flatElementtemplate2 if onOpening else flatElementtemplate1)
                     element.setNodesByIdentifier(eftFlat2 if onOpening else eftFlat1, nodeIdentifiers)
                 if xOrgan:
-                    element.merge(organElementtemplate)
                     element.setNodesByIdentifier(eftOrgan, nodeIdentifiers)
                 elementIdentifier = elementIdentifier + 1
 
                 annotationGroups = annotationGroupsAround[e1] + annotationGroupsAlong[e2] + \
                                    annotationGroupsThroughWall[e3]
                 if annotationGroups:
-                    allAnnotationGroups = mergeAnnotationGroups(allAnnotationGroups, annotationGroups)
-                    for annotationGroup in annotationGroups:
-                        meshGroup = annotationGroup.getMeshGroup(mesh)
-                        meshGroup.addElement(element)
+                    addElementToAnnotationGroups(element, annotationGroups)
 
     fm.endChange()
 
@@ -894,20 +1099,21 @@ class CylindricalSegmentTubeMeshOuterPoints:
 
     def getCylindricalSegmentTubeMeshOuterPoints(self, nSegment):
 
-        elementAlongStartIdx = nSegment * self._elementsCountAlongSegment
-        elementAlongEndIdx = (nSegment + 1) * self._elementsCountAlongSegment
+        elementsCountAlongSegment = self._elementsCountAlongSegment
+        elementAlongStartIdx = nSegment * elementsCountAlongSegment
+        elementAlongEndIdx = (nSegment + 1) * elementsCountAlongSegment
 
         xOuter, d1Outer, d2Outer, transitElementList, xiSegment, flatWidthSegment, segmentAxis, radiusAlongSegmentList \
-            = getCylindricalSegmentOuterPoints(self._elementsCountAround, self._elementsCountAlongSegment,
+            = getCylindricalSegmentOuterPoints(self._elementsCountAround, elementsCountAlongSegment,
                                                self._segmentLength, self._wallThickness,
                                                self._outerRadiusList[elementAlongStartIdx: elementAlongEndIdx + 1],
                                                self._startPhase)
 
         startIdx = 0 if nSegment == 0 else 1
-        xi = xiSegment[startIdx:self._elementsCountAlongSegment + 1]
+        xi = xiSegment[startIdx:elementsCountAlongSegment + 1]
         self._xiList += xi
 
-        flatWidth = flatWidthSegment[startIdx:self._elementsCountAlongSegment + 1]
+        flatWidth = flatWidthSegment[startIdx:elementsCountAlongSegment + 1]
         self._flatWidthList += flatWidth
 
         return xOuter, d1Outer, d2Outer, transitElementList, segmentAxis, radiusAlongSegmentList
@@ -943,46 +1149,43 @@ def getCylindricalSegmentOuterPoints(elementsCountAround, elementsCountAlongSegm
     # create nodes
     segmentAxis = [0.0, 0.0, 1.0]
 
-    xFinal = []
-    d1Final = []
     d2Final = []
-    xiList = []
-    flatWidthList = []
-    sRadiusAlongSegment = []
-
-    for n2 in range(elementsCountAlongSegment + 1):
-        radius = radiusList[n2]
-        sRadiusAlongSegment.append(radius)
-        z = segmentLength / elementsCountAlongSegment * n2 + startPhase / 360.0 * segmentLength
-
-        xLoop, d1Loop = createCirclePoints([0.0, 0.0, z], [radius, 0.0, 0.0], [0.0, radius, 0.0],
-                                           elementsCountAround, startRadians=0.0)
-        xFinal = xFinal + xLoop
-        d1Final = d1Final + d1Loop
-
-    # Smooth d2 for segment
-    smoothd2Raw = []
+    sRadiusAlongSegment = [radiusList[n2] for n2 in range(elementsCountAlongSegment + 1)]
+    flatWidthList = (2.0*math.pi*(np.array(sRadiusAlongSegment) + wallThickness)).tolist()
+
+    # all rings share one set of angles around: build the trig tables once with
+    # the same running angle createCirclePoints uses, then broadcast per radius
+    radiansPerElementAround = 2.0*math.pi/elementsCountAround
+    cosAround = np.empty(elementsCountAround)
+    sinAround = np.empty(elementsCountAround)
+    radiansAround = 0.0
     for n1 in range(elementsCountAround):
-        nx = []
-        nd2 = []
-        for n2 in range(elementsCountAlongSegment + 1):
-            n = n2 * elementsCountAround + n1
-            nx.append(xFinal[n])
-            nd2.append(segmentAxis)
-        smoothd2 = interp.smoothCubicHermiteDerivativesLine(nx, nd2)
-        smoothd2Raw.append(smoothd2)
-
-    # Re-arrange smoothd2
-    for n2 in range(elementsCountAlongSegment + 1):
-        radius = sRadiusAlongSegment[n2]
-        flatWidth = 2.0*math.pi*(radius + wallThickness)
-        flatWidthList.append(flatWidth)
-        xiFace = []
-        for n1 in range(elementsCountAround):
-            d2Final.append(smoothd2Raw[n1][n2])
-        for n1 in range(elementsCountAround + 1):
-            xi = 1.0/elementsCountAround * n1
-            xiFace.append(xi)
-        xiList.append(xiFace)
+        cosAround[n1] = math.cos(radiansAround)
+        sinAround[n1] = math.sin(radiansAround)
+        radiansAround += radiansPerElementAround
+    radiusColumn = np.array(sRadiusAlongSegment)[:, None]
+    zColumn = np.array([segmentLength / elementsCountAlongSegment * n2 + startPhase / 360.0 * segmentLength
+                        for n2 in range(elementsCountAlongSegment + 1)])[:, None]
+    xRings = np.empty((elementsCountAlongSegment + 1, elementsCountAround, 3))
+    xRings[:, :, 0] = cosAround*radiusColumn
+    xRings[:, :, 1] = sinAround*radiusColumn
+    xRings[:, :, 2] = zColumn
+    d1Rings = np.empty_like(xRings)
+    d1Rings[:, :, 0] = radiansPerElementAround*(-sinAround*radiusColumn)
+    d1Rings[:, :, 1] = radiansPerElementAround*(cosAround*radiusColumn)
+    d1Rings[:, :, 2] = 0.0
+    xFinal = xRings.reshape(-1, 3).tolist()
+    d1Final = d1Rings.reshape(-1, 3).tolist()
+
+    # Smooth d2 for all lines along the segment in one batched call; all lines
+    # start from the same segment axis derivatives
+    nd2 = np.tile(segmentAxis, (elementsCountAround, elementsCountAlongSegment + 1, 1))
+    smoothd2Array = _smoothCubicHermiteDerivativesLines(xRings.transpose(1, 0, 2), nd2)
+
+    # xi around is the same for every face, and is only read downstream,
+    # so all faces can share one row
+    xiFace = [1.0/elementsCountAround * n1 for n1 in range(elementsCountAround + 1)]
+    xiList = [xiFace]*(elementsCountAlongSegment + 1)
+    d2Final += smoothd2Array.transpose(1, 0, 2).reshape(-1, 3).tolist()
 
     return xFinal, d1Final, d2Final, transitElementList, xiList, flatWidthList, segmentAxis, sRadiusAlongSegment